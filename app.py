@@ -1,11 +1,50 @@
 from dash import Dash
+from flask import jsonify
+from data_store import store
+from rate_limit import limiter
+from refresh_schedule import RefreshScheduler
 from frontend import create_layout
+from views import figure_cache, view_cache
 
 app = Dash(__name__)
 application = app.server
 
-# Set the layout for the app
-app.layout = create_layout()
+# Poll each source on its publication calendar; /readyz reports when the first load is in
+scheduler = RefreshScheduler(store)
+scheduler.start()
+
+# Passing the function makes every page load render the latest snapshot, for the view in its query string
+app.layout = create_layout
+
+# Health checks answer from in-memory state only, never from upstreams or the page render
+@application.route('/healthz')
+def healthz():
+    return jsonify(status='ok')
+
+@application.route('/readyz')
+def readyz():
+    ready = store.is_ready()
+    body = jsonify(
+        status='ready' if ready else 'loading',
+        version=store.version,
+        data_age_seconds=store.data_age()
+    )
+    return body, 200 if ready else 503
+
+@application.route('/api/version')
+def data_version():
+    snapshot = store.snapshot
+    return jsonify(version=snapshot.version, sources=snapshot.versions)
+
+@application.route('/api/rate-limits')
+def rate_limits():
+    return jsonify(queue_depth=limiter.queue_depth())
+
+@application.route('/api/view-cache')
+def view_cache_stats():
+    return jsonify(views=view_cache.stats(), figures=figure_cache.stats())
+
+# /api/stream is served by stream_app.py under gevent, see Procfile
 
 if __name__ == '__main__':
     application.run(host='0.0.0.0', port=8080)
@@ -0,0 +1,70 @@
+// Live updates pushed from /api/stream. KPIs are patched in place; figures are
+// refetched by bumping the version poll, whose callback only resends what changed.
+// The interval poll only runs while the stream is down.
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+
+    var RETRY_CLOSED_MS = 10 * 1000;
+    var version = null;
+
+    function setProps(id, props) {
+        if (window.dash_clientside && window.dash_clientside.set_props && document.getElementById(id)) {
+            window.dash_clientside.set_props(id, props);
+        }
+    }
+
+    function setVersion(newVersion) {
+        if (newVersion !== version) {
+            version = newVersion;
+            // Any new value fires the poll callback, even while the interval itself is disabled
+            setProps('version-poll', {n_intervals: Date.now()});
+        }
+    }
+
+    function connect() {
+        // Wait for Dash to render the page so we know which version it was built from
+        var container = document.querySelector('[data-version]');
+        if (!container) {
+            setTimeout(connect, 200);
+            return;
+        }
+        if (version === null) {
+            version = container.getAttribute('data-version');
+        }
+
+        var source = new EventSource('/api/stream');
+
+        source.onopen = function () {
+            setProps('version-poll', {disabled: true});
+        };
+
+        source.onerror = function () {
+            setProps('version-poll', {disabled: false});
+            // The browser retries dropped streams on its own, but gives up on error responses,
+            // e.g. a 502 while the stream process restarts
+            if (source.readyState === EventSource.CLOSED) {
+                setTimeout(connect, RETRY_CLOSED_MS * (1 + Math.random()));
+            }
+        };
+
+        source.addEventListener('hello', function (event) {
+            setVersion(JSON.parse(event.data).version);
+        });
+
+        source.addEventListener('snapshot', function (event) {
+            var diff = JSON.parse(event.data);
+            Object.keys(diff.kpis).forEach(function (id) {
+                setProps(id, {children: diff.kpis[id]});
+            });
+            if (diff.figures.length) {
+                setVersion(diff.version);
+            } else {
+                version = diff.version;
+            }
+        });
+    }
+
+    connect();
+})();
@@ -1,16 +1,113 @@
-import requests
+import os
+import threading
 import pandas as pd
+from collections import defaultdict
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from bs4 import BeautifulSoup
 from io import BytesIO
+from catalog import catalog_fetched, load_catalog
+from fetch_plan import batch_lookup, fetch_batch
+from futures_curve import FuturesCurve, contract_maturity, contract_month, implied_devaluation
+from rate_limit import limited_get
+from series_graph import SeriesGraph
+
+# Upstream base URLs, overridable so the app can run against local stand-ins
+BCRA_API_URL = os.environ.get('BCRA_API_URL', "https://api.bcra.gob.ar/estadisticas/v2.0")
+ROFEX_API_URL = os.environ.get('ROFEX_API_URL', "https://rofex.primary.ventures/api/v2")
+INDEC_URL = os.environ.get('INDEC_URL', "https://www.indec.gob.ar")
+
+# BCRA principal variable ids, see /PrincipalesVariables for the full catalog
+OFFICIAL_DOLLAR_ID = 4
+POLICY_RATE_ID = 6
+BASE_MONEY_ID = 15
+DEPOSITS_ID = 21
+REM_ID = 29
+
+# Date windows each panel needs from the BCRA API
+def last_days(days):
+    def window():
+        end_date = datetime.now().date()
+        return end_date - timedelta(days=days), end_date
+    return window
+
+def whole_months(months):
+    # Starts on the 1st, so the base month before the first shown one is always complete
+    # and the start only moves when the month rolls over
+    def window():
+        end_date = datetime.now().date()
+        return end_date.replace(day=1) - relativedelta(months=months), end_date
+    return window
+
+def month_end_window(months_back, days=10):
+    # REM is published as of the last day of the month
+    def window():
+        end_date = (datetime.today().replace(day=1) - relativedelta(months=months_back - 1)).date() - timedelta(days=1)
+        return end_date - timedelta(days=days), end_date
+    return window
+
+MONEY_HISTORY_MONTHS = 12
+MONEY_WINDOW = whole_months(MONEY_HISTORY_MONTHS)
+RECENT_WINDOW = last_days(7)
+REM_WINDOW = month_end_window(1)
+REM_FALLBACK_WINDOW = month_end_window(2)
+
+# BCRA revises the latest days of the aggregates, so incremental fetches re-read a short overlap
+MONEY_OVERLAP_DAYS = 7
+MONEY_SERIES = {BASE_MONEY_ID: 'base_money', DEPOSITS_ID: 'deposits'}
+MONEY_LABELS = {'base_money': 'Base Money', 'deposits': 'Bank Deposits', 'm2': 'M2'}
+
+def build_money_graph():
+    graph = SeriesGraph().source('base_money').source('deposits')
+    graph.derive('m2', 'sum', ['base_money', 'deposits'])
+    for name in MONEY_LABELS:
+        graph.derive(f'{name}_monthly', 'resample', [name], rule='ME')
+        graph.derive(f'{name}_variation', 'pct_change', [f'{name}_monthly'])
+    return graph
+
+MONEY_GRAPH = build_money_graph()
+
+def incremental_window(graph, name, full_window=MONEY_WINDOW):
+    # Full history on the first load, then only what is new since the last stored date
+    def window():
+        start_date, end_date = full_window()
+        last_date = graph.last_date(name)
+        if last_date is not None:
+            start_date = max(start_date, last_date.date() - timedelta(days=MONEY_OVERLAP_DAYS))
+        return start_date, end_date
+    return window
+
+def money_window(id_variable):
+    return incremental_window(MONEY_GRAPH, MONEY_SERIES[id_variable])
+
+# Source name -> (BCRA variable id, window) pairs it reads, so a refresh can plan its requests up front
+SERIES_REGISTRY = {
+    'money': [(BASE_MONEY_ID, money_window(BASE_MONEY_ID)), (DEPOSITS_ID, money_window(DEPOSITS_ID))],
+    'policy_rate': [(POLICY_RATE_ID, RECENT_WINDOW)],
+    'dollar': [(OFFICIAL_DOLLAR_ID, RECENT_WINDOW)],
+    'rem': [(REM_ID, REM_WINDOW)],
+}
+
+# Date of the latest observation each source fetched; the scheduler compares it with the date
+# a release should bring, since a value that didn't move still means the release is in
+LAST_OBSERVATION = {}
+
+def record_observation(name, when):
+    if when is not None and not pd.isna(when):
+        LAST_OBSERVATION[name] = pd.Timestamp(when)
 
 # BCRA API REQUESTS
 def request_bcra(id_variable, start_date, end_date):
-    base_url = "https://api.bcra.gob.ar/estadisticas/v2.0/DatosVariable"
+    planned = batch_lookup(id_variable, start_date, end_date)
+    if planned is not None:
+        return planned
+    return fetch_bcra(id_variable, start_date, end_date)
+
+def fetch_bcra(id_variable, start_date, end_date):
+    base_url = f"{BCRA_API_URL}/DatosVariable"
     url = f"{base_url}/{id_variable}/{start_date}/{end_date}"
 
-    response = requests.get(url, verify='bcra-gob-ar.pem')
+    response = limited_get(url, verify='bcra-gob-ar.pem')
 
     if response.status_code == 200:
         data = response.json()
@@ -21,9 +118,16 @@ def request_bcra(id_variable, start_date, end_date):
         print(response.text)
         return None
 
-def request_money_data(id_variable):
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=365)
+def planned_fetch(names):
+    needs = [
+        (id_variable, *window())
+        for name in names
+        for id_variable, window in SERIES_REGISTRY.get(name, [])
+    ]
+    return fetch_batch(fetch_bcra, needs)
+
+def request_money_data(id_variable, window=MONEY_WINDOW):
+    start_date, end_date = window()
     df = request_bcra(id_variable, start_date, end_date)
     if df is not None:
         df.drop('idVariable', axis=1, inplace=True)
@@ -31,101 +135,162 @@ def request_money_data(id_variable):
         df.set_index('fecha', inplace=True)
     return df
 
-def monthly_variation(df):
-    monthly_df = df.resample('ME').mean()
-    monthly_df['monthly_variation'] = monthly_df['valor'].pct_change()
-    monthly_df.reset_index(inplace=True)
-    monthly_df = monthly_df[1:]
+def monthly_variation(name, start_date):
+    monthly_df = pd.DataFrame({
+        'valor': MONEY_GRAPH[f'{name}_monthly'],
+        'monthly_variation': MONEY_GRAPH[f'{name}_variation']
+    })
+    # Keep the months that start inside the window; the one before only serves as a base
+    monthly_df = monthly_df[monthly_df.index.to_period('M').start_time > pd.Timestamp(start_date)]
+    monthly_df = monthly_df.rename_axis('fecha').reset_index()
     monthly_df['fecha'] = monthly_df['fecha'] - timedelta(days=28)
     return monthly_df
 
 def get_combined_data():
-    monthly_deposits = monthly_variation(request_money_data(21))
-    monthly_base_money = monthly_variation(request_money_data(15))
-
-    base_money = request_money_data(15)
-    deposits = request_money_data(21)
-
-    m2 = base_money.join(deposits, how='inner', lsuffix='_base_money', rsuffix='_deposits')
-    m2['valor'] = m2['valor_base_money'] + m2['valor_deposits']
-    m2 = m2[['valor']]
-
-    monthly_m2 = monthly_variation(m2)
+    # Only the new tail of each aggregate is fetched and M2 and the monthly variations
+    # are recomputed from the first changed date on
+    start_date, _ = MONEY_WINDOW()
+    for id_variable, name in MONEY_SERIES.items():
+        df = request_money_data(id_variable, money_window(id_variable))
+        MONEY_GRAPH.update(name, df['valor'])
+    # History older than the window goes, so long-running and fresh workers hold the same months.
+    # The window starts on the 1st, so this only drops anything when the month rolls over
+    MONEY_GRAPH.trim(start_date)
+    MONEY_GRAPH.recompute()
+    record_observation('money', MONEY_GRAPH.last_date('m2'))
 
     combined_df = pd.concat([
-        monthly_base_money.assign(type='Base Money'),
-        monthly_deposits.assign(type='Bank Deposits'),
-        monthly_m2.assign(type='M2')
+        monthly_variation(name, start_date).assign(type=label)
+        for name, label in MONEY_LABELS.items()
     ])
 
     return combined_df
 
-def get_policy_rate_data():
-    id_variable = 6
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=7)
+# USER-SELECTED BCRA SERIES
+CATALOG_SERIES_TTL = timedelta(minutes=30)
+CATALOG_GRAPH = SeriesGraph()
+_catalog_series_fetched = {}
+_catalog_series_locks = defaultdict(threading.Lock)
+
+def get_catalog():
+    def fetch():
+        response = limited_get(f"{BCRA_API_URL}/PrincipalesVariables", verify='bcra-gob-ar.pem')
+        if response.status_code != 200:
+            print(f"Catalog request failed with status code {response.status_code}")
+            return None
+        return response.json()['results']
+    catalog = load_catalog(fetch)
+    record_observation('catalog', catalog_fetched())
+    return catalog
+
+def get_series(id_variable):
+    # Only pass ids checked against the catalog (catalog.known_ids), each one keeps a node and a lock.
+    # Same incremental path as the money aggregates: after the first load only the new tail is fetched,
+    # and at most once per TTL. Locks are per series so one slow fetch doesn't hold up the others.
+    name = f"var_{id_variable}"
+    with _catalog_series_locks[id_variable]:
+        if name not in CATALOG_GRAPH.nodes:
+            CATALOG_GRAPH.source(name)
+        fetched = _catalog_series_fetched.get(id_variable)
+        if fetched is None or datetime.now() - fetched > CATALOG_SERIES_TTL:
+            try:
+                df = request_money_data(id_variable, incremental_window(CATALOG_GRAPH, name))
+            except Exception as e:
+                # Serve whatever is cached; the next request tries again
+                print(f"Request for variable {id_variable} failed: {e}")
+                return CATALOG_GRAPH[name]
+            if df is not None and not df.empty:
+                CATALOG_GRAPH.update(name, df['valor'])
+                CATALOG_GRAPH.recompute()
+            _catalog_series_fetched[id_variable] = datetime.now()
+        return CATALOG_GRAPH[name]
+
+def get_policy_rate():
+    id_variable = POLICY_RATE_ID
+    start_date, end_date = RECENT_WINDOW()
 
     policy_rate_df = request_bcra(id_variable, start_date, end_date)
     policy_rate_df.drop('idVariable', axis=1, inplace=True)
+    record_observation('policy_rate', policy_rate_df['fecha'].iloc[-1])
+
+    return policy_rate_df['valor'].iloc[-1]
 
-    policy_rate = policy_rate_df['valor'].iloc[-1]
+def get_policy_rate_data():
+    policy_rate = get_policy_rate()
     monthly_policy_rate = str(round(policy_rate / 12, 2)) + '%'
 
     return policy_rate, monthly_policy_rate
 
-def get_rem_data(policy_rate):
-    id_variable = 29
-    end_date = datetime.today().replace(day=1) - relativedelta(days=1)
-    start_date = end_date - timedelta(days=10)
-
-    rem_12_month = request_bcra(id_variable, start_date, end_date)
+def get_rem_value():
+    id_variable = REM_ID
+    rem_12_month = request_bcra(id_variable, *REM_WINDOW())
 
-    if not isinstance(rem_12_month, pd.DataFrame):
-        end_date = (datetime.today().replace(day=1) - relativedelta(months=1)).replace(day=1) - relativedelta(days=1)
-        start_date = end_date - timedelta(days=10)
-        rem_12_month = request_bcra(id_variable, start_date, end_date)
+    if not isinstance(rem_12_month, pd.DataFrame) or rem_12_month.empty:
+        # Last month may not be published yet, fall back to the one before
+        rem_12_month = request_bcra(id_variable, *REM_FALLBACK_WINDOW())
 
     rem_12_month.drop('idVariable', axis=1, inplace=True)
-    rem_12_month_value = rem_12_month['valor'].iloc[-1]
+    record_observation('rem', rem_12_month['fecha'].iloc[-1])
+    return rem_12_month['valor'].iloc[-1]
+
+def get_rem_data(policy_rate):
+    rem_12_month_value = get_rem_value()
     real_policy_rate = round(policy_rate - rem_12_month_value, 2)
 
     return str(rem_12_month_value) + '%', str(real_policy_rate) + '%'
 
 def get_dollar_data():
-    id_variable = 4
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=7)
+    id_variable = OFFICIAL_DOLLAR_ID
+    start_date, end_date = RECENT_WINDOW()
 
     min_official_dollar = request_bcra(id_variable, start_date, end_date)
     min_official_dollar.drop('idVariable', axis=1, inplace=True)
+    record_observation('dollar', min_official_dollar['fecha'].iloc[-1])
 
     return min_official_dollar['valor'].iloc[-1]
 
+# MATBA-ROFEX DOLLAR FUTURES
+def request_rofex_bars(ticker, start, end):
+    time_format = '%Y-%m-%dT%H%%3A%M%%3A%S.000Z'
+    url = f"{ROFEX_API_URL}/series/securities/{ticker}?resolution=1&from={start:{time_format}}&to={end:{time_format}}"
+    response = limited_get(url)
+    return pd.DataFrame(response.json()['series'])
+
+FUTURES_CURVE = FuturesCurve(request_rofex_bars)
+DEVALUATION_HORIZONS = (3, 6, 12)
+
+def get_dollar_futures():
+    closes = FUTURES_CURVE.update()
+    if not closes.empty:
+        record_observation('dollar_futures', closes.index[-1])
+    return closes
+
+def reference_maturity(today):
+    # The KPI has always used the contract for the prior month of next year
+    return pd.Timestamp(contract_maturity(*contract_month(today, 11)))
+
 def get_dollar_future():
-    prior_month = datetime.now().date().month - 1
-    current_year = datetime.now().date().year
-    month_str = (datetime(current_year, prior_month, 1)).strftime("%b").upper()
-    next_year = str(current_year + 1)[2:]
-    prior_month_next_year = month_str + next_year
-
-    current_day = str(datetime.now().date())
-    url = f"https://rofex.primary.ventures/api/v2/series/securities/rx_DDF_DLR_{prior_month_next_year}?resolution=1&from={current_day}T13%3A00%3A00.000Z&to={current_day}T21%3A00%3A00.000Z"
-    response = requests.get(url)
-    data = response.json()
-
-    results = data['series']
-    for days_prior in range(1, 10):
-        if results:
-            break
-        else:
-            date = str(datetime.now().date() - timedelta(days=days_prior))
-            url = f"https://rofex.primary.ventures/api/v2/series/securities/rx_DDF_DLR_{prior_month_next_year}?resolution=1&from={date}T13%3A00%3A00.000Z&to={date}T21%3A00%3A00.000Z"
-            response = requests.get(url)
-            data = response.json()
-            results = data['series']
-
-    dollar_future = pd.DataFrame(results)
-    return dollar_future['c'][0] if not dollar_future.empty else None
+    closes = get_dollar_futures()
+    return reference_close(closes, datetime.now().date())
+
+def reference_close(closes, today):
+    maturity = reference_maturity(today)
+    if closes.empty or maturity not in closes.columns:
+        return None
+    series = closes[maturity].dropna()
+    return series.iloc[-1] if not series.empty else None
+
+def devaluation_adjusted_rates(closes, spot, policy_rate, today):
+    if closes.empty:
+        return {}
+    devaluation = implied_devaluation(closes.iloc[[-1]], spot).iloc[0].dropna()
+    rates = {}
+    for months in DEVALUATION_HORIZONS:
+        horizon = pd.Timestamp(today) + pd.DateOffset(months=months)
+        candidates = devaluation[devaluation.index >= horizon]
+        if not candidates.empty:
+            rates[f'{months}m'] = round(policy_rate - candidates.iloc[0], 2)
+    return rates
 
 def calculate_exp_dev_adj_rate(min_official_dollar, dollar_future, policy_rate):
     expected_devaluation = min_official_dollar / dollar_future * 100
@@ -133,8 +298,8 @@ def calculate_exp_dev_adj_rate(min_official_dollar, dollar_future, policy_rate):
     return str(exp_dev_adj_rate) + '%'
 
 def get_inflation_data():
-    url = "https://www.indec.gob.ar/Nivel4/Tema/3/5/31"
-    response = requests.get(url)
+    url = f"{INDEC_URL}/Nivel4/Tema/3/5/31"
+    response = limited_get(url)
     soup = BeautifulSoup(response.content, 'html.parser')
     link_tag = soup.find("a", class_="a-color2", href=True, target="_blank")
 
@@ -144,8 +309,8 @@ def get_inflation_data():
         print("Link not found")
         return None
 
-    url = "https://www.indec.gob.ar" + ipc_file_href
-    response = requests.get(url)
+    url = INDEC_URL + ipc_file_href
+    response = limited_get(url)
     data = BytesIO(response.content)
 
     ipc = pd.read_excel(data)
@@ -156,5 +321,49 @@ def get_inflation_data():
     ipc.rename(columns={'Total nacional': 'Fecha'}, inplace=True)
     columns_to_divide = ipc.columns[ipc.columns != 'Fecha']
     ipc[columns_to_divide] = ipc[columns_to_divide] / 100
+    record_observation('inflation', pd.to_datetime(ipc['Fecha']).max())
 
     return ipc
+
+def build_kpis(data):
+    policy_rate = data.get('policy_rate')
+    rem_12_month = data.get('rem')
+    min_official_dollar = data.get('dollar')
+    dollar_futures = data.get('dollar_futures')
+    today = datetime.now().date()
+    dollar_future = reference_close(dollar_futures, today) if dollar_futures is not None else None
+
+    kpis = {
+        'monthly_policy_rate': "N/A",
+        'rem_12_month': "N/A",
+        'real_policy_rate': "N/A",
+        'exp_dev_adj_rate': "N/A",
+        'dev_adj_curve': "N/A"
+    }
+    if rem_12_month is not None:
+        kpis['rem_12_month'] = str(rem_12_month) + '%'
+    if policy_rate is None:
+        return kpis
+
+    kpis['monthly_policy_rate'] = str(round(policy_rate / 12, 2)) + '%'
+    if rem_12_month is not None:
+        kpis['real_policy_rate'] = str(round(policy_rate - rem_12_month, 2)) + '%'
+    if min_official_dollar is not None and dollar_future is not None:
+        kpis['exp_dev_adj_rate'] = calculate_exp_dev_adj_rate(min_official_dollar, dollar_future, policy_rate)
+    if min_official_dollar is not None and dollar_futures is not None:
+        rates = devaluation_adjusted_rates(dollar_futures, min_official_dollar, policy_rate, today)
+        if rates:
+            kpis['dev_adj_curve'] = ' · '.join(f"{horizon} {rate}%" for horizon, rate in rates.items())
+
+    return kpis
+
+# Each source is refreshed independently; KPIs are derived from the raw values
+SOURCES = {
+    'money': get_combined_data,
+    'inflation': get_inflation_data,
+    'policy_rate': get_policy_rate,
+    'rem': get_rem_value,
+    'dollar': get_dollar_data,
+    'dollar_futures': get_dollar_futures,
+    'catalog': get_catalog,
+}
@@ -0,0 +1,211 @@
+"""Per-figure build time of the graph_objects builders against the original plotly.express ones.
+
+Run from the repository root: python benchmarks/bench_figures.py
+"""
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import figures
+
+REPEAT = 5
+NUMBER = 20
+
+def sample_money_data(months=12):
+    dates = pd.date_range('2024-01-01', periods=months, freq='MS')
+    rng = np.random.default_rng(0)
+    return pd.concat([
+        pd.DataFrame({'fecha': dates, 'monthly_variation': rng.normal(0.05, 0.03, months), 'type': name})
+        for name in ('Base Money', 'Bank Deposits', 'M2')
+    ])
+
+def sample_inflation_data(months=90):
+    rng = np.random.default_rng(1)
+    ipc = pd.DataFrame({'Fecha': pd.date_range('2017-01-01', periods=months, freq='MS')})
+    for column in ('Nivel general', 'Núcleo', 'Estacional', 'Regulados'):
+        ipc[column] = rng.normal(0.04, 0.02, months)
+    return ipc
+
+# Original plotly.express builders, kept here as the baseline
+def legacy_money_agg_graph(combined_df):
+    money_agg = px.bar(
+        combined_df,
+        x='fecha',
+        y='monthly_variation',
+        color='type',
+        title='Base Money, M2, and Deposits - Monthly Var %',
+        labels={'fecha': 'Date', 'monthly_variation': 'Var %'},
+        barmode='group',
+        color_discrete_map={
+            'Base Money': '#5A6ACF',
+            'M2': '#737B8B',
+            'Bank Deposits': '#E6E8EC'
+        }
+    )
+    y_min = combined_df['monthly_variation'].min() - 0.05
+    y_max = combined_df['monthly_variation'].max() + 0.05
+
+    money_agg.update_layout(
+        font=dict(
+            family="Poppins, sans-serif"
+        ),
+        title=dict(
+            text="Base Money, M2, and Deposits - Monthly Var %",
+            yanchor='top',
+            xanchor='left',
+            y=0.98
+        ),
+        margin=dict(t=100),
+        legend=dict(
+            title="Concepts",
+            title_font=dict(size=9, color="gray"),
+            orientation="v",
+            yanchor="top",
+            y=1.3,
+            xanchor="left",
+            x=0
+        ),
+        xaxis_title=None,
+        yaxis_title=None,
+        yaxis_tickformat=',.1%',
+        plot_bgcolor='white',
+        bargroupgap=0.2,
+        xaxis=dict(
+            tickfont=dict(color='#737B8B'),
+            showgrid=False,
+            zeroline=False,
+            rangeslider=dict(
+                visible=True,
+                thickness=0.005,
+                bordercolor="lightgrey",
+                borderwidth=1
+            ),
+            rangeselector=dict(
+                yanchor="top",
+                xanchor="left",
+                x=0.7,
+                buttons=list([
+                    dict(count=1, label="1m", step="month", stepmode="backward"),
+                    dict(count=6, label="6m", step="month", stepmode="backward"),
+                    dict(count=1, label="YTD", step="year", stepmode="todate"),
+                    dict(count=1, label="1y", step="year", stepmode="backward"),
+                    dict(step="all")
+                ])
+            )
+        ),
+        yaxis=dict(
+            range=[y_min, y_max],
+            tickfont=dict(color='#737B8B'),
+            showgrid=True,
+            gridcolor='lightgrey',
+            gridwidth=1,
+            griddash='dash',
+            zeroline=True,
+            zerolinecolor='lightgrey',
+            ticksuffix="  "
+        )
+    )
+
+    money_agg.update_traces(marker=dict(line=dict(width=0)), hovertemplate='<b>Date:</b> %{x|%b %Y}<br><b>Monthly Var%:</b> %{y:.1%}<extra></extra>')
+    return money_agg
+
+def legacy_inflation_graph(ipc):
+    inflation = px.line(ipc, x='Fecha', y='Nivel general', title='Inflation',
+                        labels={'Fecha': 'Date', 'Nivel general': 'Inflation %'})
+
+    inflation.update_traces(mode='lines', name='Total', line=dict(color='#5A6ACF'))
+
+    inflation.add_traces([
+        dict(x=ipc['Fecha'], y=ipc['Núcleo'], mode='lines', name='Core', line=dict(color='#737B8B')),
+        dict(x=ipc['Fecha'], y=ipc['Estacional'], mode='lines', name='Seasonal', line=dict(color='#CDCFD2')),
+        dict(x=ipc['Fecha'], y=ipc['Regulados'], mode='lines', name='Regulated', line=dict(color='#86AAFF'))
+    ])
+
+    for trace in inflation.data:
+        trace.showlegend = True
+        trace.hovertemplate = '<b>Date:</b> %{x|%b %Y}<br><b>Monthly Inflation%:</b> %{y:.1%}<extra></extra>'
+        trace.visible = 'legendonly' if trace.name != 'Total' else True
+
+    y_min = min(ipc[['Nivel general', 'Núcleo', 'Estacional', 'Regulados']].min()) - 0.05
+    y_max = max(ipc[['Nivel general', 'Núcleo', 'Estacional', 'Regulados']].max()) + 0.05
+
+    end_date = ipc['Fecha'].max()
+    start_date = end_date - timedelta(days=6 * 30)
+
+    inflation.update_layout(
+        font=dict(
+            family="Poppins, sans-serif"
+        ),
+        xaxis_title=None,
+        yaxis_title=None,
+        yaxis_tickformat=',.1%',
+        plot_bgcolor='white',
+        xaxis=dict(
+            range=[start_date, end_date],
+            tickfont=dict(color='#737B8B'),
+            showgrid=False,
+            zeroline=False,
+            rangeslider=dict(
+                visible=True,
+                thickness=0.005,
+                bordercolor="lightgrey",
+                borderwidth=1
+            ),
+            rangeselector=dict(
+                yanchor="top",
+                xanchor="left",
+                x=0.7,
+                buttons=list([
+                    dict(count=1, label="1m", step="month", stepmode="backward"),
+                    dict(count=6, label="6m", step="month", stepmode="backward"),
+                    dict(count=1, label="YTD", step="year", stepmode="todate"),
+                    dict(count=1, label="1y", step="year", stepmode="backward"),
+                    dict(step="all")
+                ])
+            )
+        ),
+        yaxis=dict(
+            range=[y_min, y_max],
+            tickfont=dict(color='#737B8B'),
+            showgrid=True,
+            gridcolor='lightgrey',
+            gridwidth=1,
+            griddash='dash',
+            zeroline=True,
+            zerolinecolor='lightgrey',
+            ticksuffix="  "
+        ),
+        legend=dict(
+            x=-0,  # Adjust this to place the legend at the left margin
+            y=1.1,
+            xanchor='left',
+            yanchor='top',
+            title=None,  # Optionally remove the legend title
+            orientation="h"
+        )
+    )
+
+    return inflation
+
+def best_time(func, arg):
+    return min(timeit.repeat(lambda: func(arg), repeat=REPEAT, number=NUMBER)) / NUMBER
+
+def main():
+    cases = [
+        ('money aggregates', sample_money_data(), legacy_money_agg_graph, figures.create_money_agg_graph),
+        ('inflation', sample_inflation_data(), legacy_inflation_graph, figures.create_inflation_graph),
+    ]
+    print(f"{'figure':<20}{'express (ms)':>14}{'graph_objects (ms)':>20}{'speedup':>10}")
+    for name, data, legacy, fast in cases:
+        legacy_time = best_time(legacy, data)
+        fast_time = best_time(fast, data)
+        print(f"{name:<20}{legacy_time * 1000:>14.2f}{fast_time * 1000:>20.2f}{legacy_time / fast_time:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
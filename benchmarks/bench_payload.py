@@ -0,0 +1,62 @@
+"""Serialized size and encode time of the figure payloads, one trimming step at a time.
+
+Every column builds the same figures.create_* figure; only the value encoding and the engine change:
+    plain    FIGURE_TYPED_ARRAYS=0 without rounding, stdlib json engine
+    rounded  values rounded to FIGURE_DECIMALS, json engine
+    typed    rounded base64 typed arrays, json engine
+    orjson   rounded typed arrays on the orjson engine, as served
+
+Run from the repository root: python benchmarks/bench_payload.py
+"""
+import timeit
+from contextlib import contextmanager
+import numpy as np
+import plotly.io as pio
+
+from bench_figures import figures, sample_inflation_data, sample_money_data
+import serialization
+
+REPEAT = 5
+NUMBER = 50
+
+@contextmanager
+def encoding(rounded, typed):
+    original_encode, original_typed = figures.encode_values, serialization.TYPED_ARRAYS
+    if not rounded:
+        figures.encode_values = lambda values, decimals=None: np.asarray(values, dtype=float)
+    serialization.TYPED_ARRAYS = typed
+    try:
+        yield
+    finally:
+        figures.encode_values, serialization.TYPED_ARRAYS = original_encode, original_typed
+
+def measure(figure, engine):
+    payload = pio.to_json(figure, engine=engine)
+    seconds = min(timeit.repeat(lambda: pio.to_json(figure, engine=engine), repeat=REPEAT, number=NUMBER)) / NUMBER
+    return len(payload), seconds
+
+def main():
+    money, inflation = sample_money_data(), sample_inflation_data()
+    builders = [
+        ('money aggregates', lambda: figures.create_money_agg_graph(money)),
+        ('inflation', lambda: figures.create_inflation_graph(inflation)),
+    ]
+    steps = [('plain', False, False, 'json'), ('rounded', True, False, 'json'), ('typed', True, True, 'json')]
+    try:
+        import orjson  # noqa: F401
+        steps.append(('orjson', True, True, 'orjson'))
+    except ImportError:
+        print("orjson not installed, skipping the orjson column")
+
+    print(f"{'figure':<20}" + ''.join(f"{name + ' KB':>12}{name + ' ms':>12}" for name, _, _, _ in steps))
+    for name, build in builders:
+        row = f"{name:<20}"
+        for _, rounded, typed, engine in steps:
+            with encoding(rounded, typed):
+                figure = build()
+            size, seconds = measure(figure, engine)
+            row += f"{size / 1024:>12.1f}{seconds * 1000:>12.3f}"
+        print(row)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Local stand-ins for the BCRA, ROFEX and INDEC endpoints the backend calls.
+
+Point the app at them with BCRA_API_URL, ROFEX_API_URL and INDEC_URL (see `upstream_env`).
+Latency and failures can be injected to see how the app behaves when upstreams degrade.
+
+Run standalone: python benchmarks/fake_upstreams.py --port 9000 --latency 0.2 --failure-rate 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+import numpy as np
+import pandas as pd
+
+IPC_FILE = '/ftp/cuadros/economia/sh_ipc.xlsx'
+IPC_MONTHS = 90
+
+SERIES_EPOCH = pd.Timestamp('2024-01-01')
+
+# Rough level and daily drift per BCRA variable id
+BCRA_SERIES = {
+    4: (900.0, 0.0008),
+    6: (40.0, 0.0),
+    15: (20_000_000.0, 0.002),
+    21: (90_000_000.0, 0.0025),
+    29: (30.0, -0.001),
+}
+BCRA_DESCRIPTIONS = {
+    4: 'Tipo de Cambio Minorista ($ por USD) Comunicación B 9791 - Promedio vendedor',
+    6: 'Tasa de Política Monetaria (en % n.a.)',
+    15: 'Base monetaria - Total (en millones de pesos)',
+    21: 'Depósitos de las EF en el BCRA (en millones de pesos)',
+    29: 'Inflación esperada - REM próximos 12 meses - MEDIANA (variación en % i.a)',
+    1: 'Reservas Internacionales del BCRA (en millones de dólares)',
+    5: 'Tipo de Cambio Mayorista ($ por USD) Comunicación A 3500 - Referencia',
+}
+
+def bcra_catalog():
+    return [
+        {'idVariable': id_variable, 'cdSerie': id_variable, 'descripcion': description,
+         'fecha': date.today().isoformat(), 'valor': 0}
+        for id_variable, description in sorted(BCRA_DESCRIPTIONS.items())
+    ]
+
+def bcra_results(id_variable, start_date, end_date):
+    level, drift = BCRA_SERIES.get(id_variable, (100.0, 0.0))
+    days = pd.bdate_range(start_date, end_date)
+    # Values depend only on the date, so overlapping windows agree
+    steps = (days - SERIES_EPOCH).days.to_numpy()
+    values = level * (1 + drift) ** steps
+    return [
+        {'idVariable': id_variable, 'fecha': day.strftime('%Y-%m-%d'), 'valor': round(float(value), 2)}
+        for day, value in zip(days, values)
+    ]
+
+def rofex_series(ticker, day):
+    # Later maturities trade at a premium of roughly 2% a month
+    maturity = datetime.strptime(ticker[-5:].title(), '%b%y').date()
+    months_ahead = max((maturity.year - day.year) * 12 + maturity.month - day.month, 0)
+    start = datetime(day.year, day.month, day.day, 13)
+    noise = np.cumsum(np.random.default_rng(day.toordinal() + months_ahead).normal(0, 0.5, 240))
+    closes = 1000 * 1.02 ** months_ahead + noise
+    return [
+        {'d': (start + timedelta(minutes=i)).isoformat() + 'Z', 'o': c, 'h': c, 'l': c, 'c': round(float(c), 2), 'v': 10}
+        for i, c in enumerate(closes)
+    ]
+
+def ipc_workbook():
+    # Same layout as INDEC's sheet: the backend reads rows 4-33 and transposes them
+    months = pd.date_range(end=date.today().replace(day=1), periods=IPC_MONTHS, freq='MS')
+    rng = np.random.default_rng(0)
+    rows = [[None] * (IPC_MONTHS + 1) for _ in range(4)]
+    rows.append(['Total nacional'] + list(months))
+    for name in ('Nivel general', 'Núcleo', 'Estacional', 'Regulados'):
+        rows.append([name] + list(np.round(rng.normal(4, 2, IPC_MONTHS), 1)))
+    rows += [[None] * (IPC_MONTHS + 1) for _ in range(25)]
+
+    buffer = BytesIO()
+    pd.DataFrame(rows, columns=['Cuadro 1'] + [None] * IPC_MONTHS).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+class UpstreamConfig:
+    def __init__(self, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = 0
+        self._ipc = None
+        self.lock = threading.Lock()
+
+    @property
+    def ipc(self):
+        if self._ipc is None:
+            self._ipc = ipc_workbook()
+        return self._ipc
+
+def make_handler(config):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send(self, status, body, content_type='application/json'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with config.lock:
+                config.requests += 1
+            if config.latency:
+                time.sleep(random.expovariate(1 / config.latency))
+            if random.random() < config.failure_rate:
+                self.send(503, b'{"status": 503}')
+                return
+
+            path, _, query = self.path.partition('?')
+            parts = path.strip('/').split('/')
+            if parts == ['bcra', 'PrincipalesVariables']:
+                self.send(200, json.dumps({'status': 200, 'results': bcra_catalog()}).encode())
+            elif parts[:2] == ['bcra', 'DatosVariable'] and len(parts) == 5:
+                results = bcra_results(int(parts[2]), parts[3][:10], parts[4][:10])
+                self.send(200, json.dumps({'status': 200, 'results': results}).encode())
+            elif parts[:3] == ['rofex', 'series', 'securities']:
+                day = date.fromisoformat(query.split('from=')[1][:10]) if 'from=' in query else date.today()
+                series = rofex_series(parts[3], day) if day.weekday() < 5 else []
+                self.send(200, json.dumps({'status': 'OK', 'series': series}).encode())
+            elif path == '/indec/Nivel4/Tema/3/5/31':
+                html = f'<html><body><a class="a-color2" href="{IPC_FILE}" target="_blank">IPC</a></body></html>'
+                self.send(200, html.encode(), 'text/html')
+            elif path == '/indec' + IPC_FILE:
+                self.send(200, config.ipc, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            else:
+                self.send(404, b'{"status": 404}')
+
+    return Handler
+
+def start_upstreams(port=0, latency=0.0, failure_rate=0.0):
+    config = UpstreamConfig(latency, failure_rate)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='fake-upstreams', daemon=True).start()
+    return server, config
+
+def upstream_env(server):
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    return {
+        'BCRA_API_URL': f"{base}/bcra",
+        'ROFEX_API_URL': f"{base}/rofex",
+        'INDEC_URL': f"{base}/indec",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--latency', type=float, default=0.0, help="mean injected latency in seconds")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    server, _ = start_upstreams(args.port, args.latency, args.failure_rate)
+    for name, value in upstream_env(server).items():
+        print(f"{name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""Concurrent-user load test for the dashboard against local fake upstreams.
+
+Starts the fake BCRA/ROFEX/INDEC servers, launches the app pointed at them, then ramps up
+simulated user sessions and reports latency percentiles, throughput and server CPU/RSS per stage.
+
+Run from the repository root:
+    python benchmarks/load_test.py --stages 1,5,10,25 --stage-seconds 30
+    python benchmarks/load_test.py --workers 3 --threads 4   # under gunicorn, like the Procfile
+    python benchmarks/load_test.py --stream-share 1.0         # every user holds an SSE stream open
+
+/api/stream is served by stream_app.py under gevent on --port + 1, like behind nginx in production.
+"""
+import argparse
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+import numpy as np
+import psutil
+import requests
+
+from fake_upstreams import start_upstreams, upstream_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSET_PATTERN = re.compile(r'(?:src|href)="(/[^"]+)"')
+STARTUP_TIMEOUT = 120
+# Each gunicorn worker loads its own data; fresh connections land on any of them, so several
+# ready answers in a row mean the stage doesn't start while one worker is still loading
+READY_CHECKS = 10
+# Longer than the server's keepalive interval, so an idle stream doesn't look like a failure
+STREAM_READ_TIMEOUT = 30
+# Query strings of a few shared links; sessions pick one at random
+VIEWS = ['', '?window=6', '?freq=quarterly', '?window=2y&series=total,core', '?window=12&series=base,m2']
+
+SYNC_OUTPUTS = [
+    ('base-money', 'figure'), ('inflation-graph', 'figure'), ('series-picker', 'options'),
+    ('monthly-policy-rate', 'children'), ('rem-12-month', 'children'), ('real-policy-rate', 'children'),
+    ('exp-dev-adj-rate', 'children'), ('dev-adj-curve', 'children'), ('data-version', 'data')
+]
+
+def start_app(port, env, workers, threads):
+    if workers:
+        command = [
+            'gunicorn', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            '--threads', str(threads), 'app:application'
+        ]
+    else:
+        command = [
+            sys.executable, '-c',
+            f"from app import application; application.run(host='127.0.0.1', port={port}, threaded=True)"
+        ]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def start_stream_app(port, env):
+    command = [
+        'gunicorn', '--bind', f'127.0.0.1:{port}', '--worker-class', 'gevent', '--workers', '1',
+        '--worker-connections', '2000', 'stream_app:application'
+    ]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def wait_until_up(url, process, checks=1):
+    deadline = time.time() + STARTUP_TIMEOUT
+    ready = 0
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("App exited during startup")
+        try:
+            ready = ready + 1 if requests.get(url, timeout=5).status_code == 200 else 0
+        except requests.RequestException:
+            ready = 0
+        if ready >= checks:
+            return
+        time.sleep(0.5)
+    raise RuntimeError("App did not come up in time")
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def timed(self, session, kind, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=30, **kwargs)
+            ok = response.status_code < 400
+        except requests.RequestException:
+            response, ok = None, False
+        elapsed = time.perf_counter() - start
+        self.record(kind, elapsed, ok)
+        return response
+
+    def record(self, kind, elapsed, ok=True):
+        with self.lock:
+            self.samples[kind].append(elapsed)
+            if not ok:
+                self.errors[kind] += 1
+
+def sync_payload(n_intervals, versions, view):
+    # The page sends the per-source versions it holds; up-to-date pages get a 204 back
+    return {
+        'output': '..' + '...'.join(f'{component}.{prop}' for component, prop in SYNC_OUTPUTS) + '..',
+        'outputs': [{'id': component, 'property': prop} for component, prop in SYNC_OUTPUTS],
+        'inputs': [{'id': 'version-poll', 'property': 'n_intervals', 'value': n_intervals}],
+        'changedPropIds': ['version-poll.n_intervals'],
+        'state': [
+            {'id': 'data-version', 'property': 'data', 'value': versions},
+            {'id': 'url', 'property': 'search', 'value': view},
+        ],
+    }
+
+def user_session(base_url, recorder, stop, polls, think_time, change_rate):
+    session = requests.Session()
+    view = random.choice(VIEWS)
+    page = recorder.timed(session, 'page', 'GET', base_url + '/' + view)
+    if page is None:
+        return
+    for asset in sorted(set(ASSET_PATTERN.findall(page.text))):
+        recorder.timed(session, 'asset', 'GET', base_url + asset)
+    # Like the browser, the layout request only carries the view in its referrer
+    recorder.timed(session, 'layout', 'GET', base_url + '/_dash-layout', headers={'Referer': base_url + '/' + view})
+    recorder.timed(session, 'layout', 'GET', base_url + '/_dash-dependencies')
+
+    versions = session.get(base_url + '/api/version', timeout=30).json()['sources']
+    for n in range(1, polls + 1):
+        if stop.is_set():
+            return
+        time.sleep(random.uniform(0.5, 1.5) * think_time)
+        recorder.timed(
+            session, 'poll', 'POST', base_url + '/_dash-update-component', json=sync_payload(n, versions, view)
+        )
+        if random.random() < change_rate:
+            # A page that missed a change in every source, so every figure comes back
+            recorder.timed(
+                session, 'figures', 'POST', base_url + '/_dash-update-component', json=sync_payload(n, {}, view)
+            )
+
+def hold_stream(stream_url, recorder, stop):
+    # Like an open tab: wait on /api/stream until the stage ends or the server closes it.
+    # Returns False when the stream couldn't be opened, so the caller polls for a session instead.
+    start = time.perf_counter()
+    try:
+        response = requests.get(stream_url + '/api/stream', stream=True, timeout=(5, STREAM_READ_TIMEOUT))
+    except requests.RequestException:
+        recorder.record('stream', time.perf_counter() - start, ok=False)
+        return False
+    try:
+        for line in response.iter_lines():
+            if line.startswith(b'event: hello'):
+                recorder.record('stream', time.perf_counter() - start, ok=response.status_code == 200)
+            if stop.is_set():
+                break
+    except requests.RequestException:
+        recorder.record('stream', time.perf_counter() - start, ok=False)
+    finally:
+        response.close()
+    return True
+
+def virtual_user(base_url, stream_url, recorder, stop, args, streaming):
+    while not stop.is_set():
+        if not streaming or not hold_stream(stream_url, recorder, stop):
+            user_session(base_url, recorder, stop, args.polls, args.think_time, args.change_rate)
+
+def probe_readiness(base_url, recorder, stop):
+    # Health checks must stay fast however many streams are open
+    session = requests.Session()
+    while not stop.wait(1.0):
+        recorder.timed(session, 'readyz', 'GET', base_url + '/readyz')
+
+def sample_resources(processes, stop, samples):
+    tree = []
+    for process in processes:
+        parent = psutil.Process(process.pid)
+        tree += [parent] + parent.children(recursive=True)
+    for proc in tree:
+        proc.cpu_percent(None)
+    while not stop.wait(1.0):
+        cpu, rss = 0.0, 0
+        for proc in tree:
+            try:
+                cpu += proc.cpu_percent(None)
+                rss += proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                pass
+        samples.append((cpu, rss))
+
+def percentile_ms(values, q):
+    return np.percentile(values, q) * 1000 if values else float('nan')
+
+def run_stage(base_url, stream_url, processes, users, args):
+    recorder = Recorder()
+    stop = threading.Event()
+    resources = []
+    sampler = threading.Thread(target=sample_resources, args=(processes, stop, resources), daemon=True)
+    sampler.start()
+    streaming_users = round(users * args.stream_share)
+    threads = [
+        threading.Thread(target=virtual_user, args=(base_url, stream_url, recorder, stop, args, i < streaming_users), daemon=True)
+        for i in range(users)
+    ]
+    threads.append(threading.Thread(target=probe_readiness, args=(base_url, recorder, stop), daemon=True))
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.stage_seconds)
+    stop.set()
+    # Open streams only notice the stop on their next keepalive, which shouldn't count toward the stage
+    elapsed = time.time() - started
+    for thread in threads:
+        thread.join()
+    sampler.join()
+    return recorder, elapsed, resources
+
+def report(users, recorder, elapsed, resources):
+    all_samples = [value for values in recorder.samples.values() for value in values]
+    errors = sum(recorder.errors.values())
+    cpu = [c for c, _ in resources] or [float('nan')]
+    rss = [r for _, r in resources] or [0]
+    print(
+        f"\n{users} users: {len(all_samples)} requests in {elapsed:.1f}s "
+        f"({len(all_samples) / elapsed:.1f} req/s), {errors} errors, "
+        f"CPU avg {np.mean(cpu):.0f}% max {np.max(cpu):.0f}%, RSS max {max(rss) / 2 ** 20:.0f} MiB"
+    )
+    print(f"  {'kind':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for kind in sorted(recorder.samples) + ['all']:
+        values = all_samples if kind == 'all' else recorder.samples[kind]
+        print(
+            f"  {kind:<10}{len(values):>8}{percentile_ms(values, 50):>10.1f}"
+            f"{percentile_ms(values, 95):>10.1f}{percentile_ms(values, 99):>10.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stages', default='1,5,10,25,50', help="comma separated concurrent users per stage")
+    parser.add_argument('--stage-seconds', type=float, default=30)
+    parser.add_argument('--polls', type=int, default=10, help="version polls per session before reloading")
+    parser.add_argument('--think-time', type=float, default=1.0, help="mean seconds between polls")
+    parser.add_argument('--change-rate', type=float, default=0.05, help="share of polls followed by a figure fetch")
+    parser.add_argument('--latency', type=float, default=0.0, help="mean latency injected into fake upstreams")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="share of upstream requests failing with 503")
+    parser.add_argument('--stream-share', type=float, default=0.5, help="share of users holding an SSE stream open")
+    parser.add_argument('--workers', type=int, default=0, help="run under gunicorn with this many workers")
+    parser.add_argument('--threads', type=int, default=1, help="gunicorn threads per worker")
+    parser.add_argument('--port', type=int, default=8050)
+    args = parser.parse_args()
+
+    upstreams, upstream_config = start_upstreams(latency=args.latency, failure_rate=args.failure_rate)
+    env = dict(os.environ, **upstream_env(upstreams))
+    # Keep the app's on-disk state away from a real instance on the same machine
+    state_dir = tempfile.mkdtemp()
+    env['RATE_LIMIT_DB'] = os.path.join(state_dir, 'rate_limit.sqlite')
+    env['CATALOG_CACHE'] = os.path.join(state_dir, 'bcra_catalog.json')
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    stream_url = f"http://127.0.0.1:{args.port + 1}"
+    processes = [start_app(args.port, env, args.workers, args.threads), start_stream_app(args.port + 1, env)]
+    try:
+        wait_until_up(base_url + '/readyz', processes[0], READY_CHECKS)
+        wait_until_up(stream_url + '/api/streams', processes[1])
+        for users in (int(stage) for stage in args.stages.split(',')):
+            report(users, *run_stage(base_url, stream_url, processes, users, args))
+        print(f"\nUpstream requests served by fakes: {upstream_config.requests}")
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+        upstreams.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+
+CATALOG_CACHE = os.environ.get(
+    'CATALOG_CACHE', os.path.join(tempfile.gettempdir(), 'argentina_dashboard_bcra_catalog.json')
+)
+CATALOG_TTL_SECONDS = 24 * 60 * 60
+CATALOG_COLUMNS = ['idVariable', 'cdSerie', 'descripcion']
+LABEL_LENGTH = 60
+
+def read_cache(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cache(path, variables):
+    # Write then rename, so other workers never read a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'fetched': time.time(), 'variables': variables}, f)
+    os.replace(tmp_path, path)
+
+def load_catalog(fetch, path=CATALOG_CACHE, ttl=CATALOG_TTL_SECONDS):
+    """Returns the BCRA variable listing indexed by id, with its description. The listing is shared on disk by every
+    worker and only refetched once it is older than `ttl`; a stale copy beats none if the fetch fails."""
+    cached = read_cache(path)
+    if cached is not None and time.time() - cached['fetched'] < ttl:
+        variables = cached['variables']
+    else:
+        variables = fetch()
+        if variables:
+            variables = [{column: variable.get(column) for column in CATALOG_COLUMNS} for variable in variables]
+            write_cache(path, variables)
+        elif cached is not None:
+            variables = cached['variables']
+        else:
+            return None
+
+    return pd.DataFrame(variables, columns=CATALOG_COLUMNS).set_index('idVariable').sort_index()
+
+def known_ids(catalog, values):
+    # Ids come from the browser, so anything that isn't a listed variable is dropped
+    ids = []
+    for value in values if isinstance(values, list) else []:
+        try:
+            id_variable = int(value)
+        except (TypeError, ValueError):
+            continue
+        if id_variable in catalog.index and id_variable not in ids:
+            ids.append(id_variable)
+    return ids
+
+def catalog_fetched(path=CATALOG_CACHE):
+    # When the listing on disk was last fetched from BCRA, None if there is no copy
+    cached = read_cache(path)
+    return datetime.fromtimestamp(cached['fetched']) if cached is not None else None
+
+def series_label(catalog, id_variable):
+    description = catalog.at[id_variable, 'descripcion'] if id_variable in catalog.index else None
+    # The API leaves some descriptions empty, which come back as None or NaN
+    if not isinstance(description, str) or not description.strip():
+        return f"Variable {id_variable}"
+    description = description if len(description) <= LABEL_LENGTH else description[:LABEL_LENGTH - 3] + '...'
+    # Truncated descriptions can repeat, the id keeps trace names apart
+    return f"{id_variable} - {description}"
+
+def catalog_options(catalog):
+    return [
+        {'label': f"{id_variable} - {description}", 'value': int(id_variable)}
+        for id_variable, description in catalog['descripcion'].items()
+    ]
@@ -0,0 +1,106 @@
+import hashlib
+import threading
+from datetime import datetime
+import pandas as pd
+from backend import LAST_OBSERVATION, SOURCES, planned_fetch
+from refresh_schedule import SCHEDULES
+
+# Sources the page can't render without; the rest degrade to "N/A"
+REQUIRED_SOURCES = ('money', 'inflation', 'policy_rate')
+
+def hash_value(value):
+    digest = hashlib.sha1()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    else:
+        digest.update(repr(value).encode())
+    return digest.hexdigest()[:16]
+
+def source_version(name, value):
+    # Intraday frames differ between workers that polled a few minutes apart, so they are versioned
+    # by the schedule interval their last bar falls in rather than by content
+    interval = getattr(SCHEDULES.get(name), 'interval', None)
+    if interval is not None and isinstance(value, pd.DataFrame) and not value.empty:
+        return hash_value((list(value.columns), value.index[-1].floor(interval)))
+    return hash_value(value)
+
+def compute_version(versions):
+    # Content hash (interval bucket for intraday sources), so every worker holding the same data
+    # reports the same version
+    digest = hashlib.sha1()
+    for name in sorted(versions):
+        digest.update(f"{name}:{versions[name]};".encode())
+    return digest.hexdigest()[:16]
+
+class Snapshot:
+    def __init__(self, data, fetched_at, versions, observed=None):
+        self.data = data
+        self.fetched_at = fetched_at
+        self.versions = versions
+        # Latest observation date per source, which the refresh scheduler checks releases against
+        self.observed = observed or {}
+        self.version = compute_version(versions)
+
+class DataStore:
+    def __init__(self, sources):
+        self.sources = sources
+        self.snapshot = Snapshot({}, {}, {})
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def subscribe(self, listener):
+        # Called as listener(previous, snapshot) from the refresh thread whenever the version changes
+        self.listeners.append(listener)
+
+    def is_ready(self):
+        data = self.snapshot.data
+        return all(name in data for name in REQUIRED_SOURCES)
+
+    def data_age(self, now=None):
+        now = now or datetime.now()
+        return {name: (now - fetched).total_seconds() for name, fetched in self.snapshot.fetched_at.items()}
+
+    def refresh(self, names=None):
+        names = list(self.sources) if names is None else names
+        results = {}
+        # Sources sharing BCRA variables get one merged request per variable, sliced back per source
+        with planned_fetch(names):
+            for name in names:
+                try:
+                    value = self.sources[name]()
+                except Exception as e:
+                    print(f"Refresh of '{name}' failed: {e}")
+                    continue
+                if value is not None:
+                    results[name] = (value, datetime.now(), source_version(name, value), LAST_OBSERVATION.get(name))
+
+        if not results:
+            return self.snapshot
+
+        # Readers keep whatever snapshot they already grabbed, the swap is a single assignment
+        with self._lock:
+            previous = self.snapshot
+            data = dict(self.snapshot.data)
+            fetched_at = dict(self.snapshot.fetched_at)
+            versions = dict(self.snapshot.versions)
+            observed = dict(self.snapshot.observed)
+            for name, (value, timestamp, version, observation) in results.items():
+                data[name] = value
+                fetched_at[name] = timestamp
+                versions[name] = version
+                if observation is not None:
+                    observed[name] = observation
+            snapshot = Snapshot(data, fetched_at, versions, observed)
+            self.snapshot = snapshot
+
+        if snapshot.version != previous.version:
+            for listener in self.listeners:
+                listener(previous, snapshot)
+        return snapshot
+
+store = DataStore(SOURCES)
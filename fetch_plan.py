@@ -0,0 +1,68 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+import pandas as pd
+
+_local = threading.local()
+
+def merge_windows(windows):
+    # Overlapping or back-to-back windows collapse into one request
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def plan_requests(needs):
+    windows = defaultdict(list)
+    for id_variable, start_date, end_date in needs:
+        windows[id_variable].append((start_date, end_date))
+    return {id_variable: merge_windows(spans) for id_variable, spans in windows.items()}
+
+class FetchBatch:
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self.frames = defaultdict(list)
+
+    def run(self, needs):
+        for id_variable, spans in plan_requests(needs).items():
+            for start_date, end_date in spans:
+                try:
+                    df = self.fetch(id_variable, start_date, end_date)
+                except Exception as e:
+                    # Consumers fall back to their own request on a miss
+                    print(f"Planned request for variable {id_variable} failed: {e}")
+                    continue
+                if df is None:
+                    continue
+                # Empty results are kept too, so a window with nothing published yet is a hit, not a refetch
+                dates = pd.to_datetime(df['fecha']).dt.date if not df.empty else None
+                self.frames[id_variable].append((start_date, end_date, df, dates))
+
+    def lookup(self, id_variable, start_date, end_date):
+        for batch_start, batch_end, df, dates in self.frames.get(id_variable, []):
+            if batch_start <= start_date and end_date <= batch_end:
+                if df.empty:
+                    return df.copy()
+                # Callers modify their frames in place, so hand out copies
+                return df[(dates >= start_date) & (dates <= end_date)].reset_index(drop=True)
+        return None
+
+@contextmanager
+def fetch_batch(fetch, needs):
+    batch = FetchBatch(fetch)
+    batch.run(needs)
+    _local.batch = batch
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+
+def batch_lookup(id_variable, start_date, end_date):
+    batch = getattr(_local, 'batch', None)
+    if batch is None:
+        return None
+    return batch.lookup(id_variable, start_date, end_date)
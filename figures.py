@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from datetime import timedelta
+from serialization import encode_dates, encode_values
+
+GREY = '#737B8B'
+MONEY_COLORS = {
+    'Base Money': '#5A6ACF',
+    'Bank Deposits': '#E6E8EC',
+    'M2': GREY
+}
+INFLATION_SERIES = [
+    ('Nivel general', 'Total', '#5A6ACF'),
+    ('Núcleo', 'Core', GREY),
+    ('Estacional', 'Seasonal', '#CDCFD2'),
+    ('Regulados', 'Regulated', '#86AAFF')
+]
+Y_PADDING = 0.05
+INFLATION_ZOOM_MONTHS = 6
+SERIES_COLORS = ['#5A6ACF', GREY, '#86AAFF', '#2a3f5f', '#CDCFD2']
+
+# Styling shared by every dashboard figure, validated once at import
+DASHBOARD_TEMPLATE = go.layout.Template(layout=dict(
+    font=dict(family="Poppins, sans-serif", color='#2a3f5f'),
+    title=dict(x=0.05),
+    hovermode='closest',
+    plot_bgcolor='white',
+    xaxis=dict(
+        title=None,
+        automargin=True,
+        tickfont=dict(color=GREY),
+        showgrid=False,
+        zeroline=False,
+        rangeslider=dict(
+            visible=True,
+            thickness=0.005,
+            bordercolor="lightgrey",
+            borderwidth=1
+        )
+    ),
+    yaxis=dict(
+        title=None,
+        automargin=True,
+        tickformat=',.1%',
+        tickfont=dict(color=GREY),
+        showgrid=True,
+        gridcolor='lightgrey',
+        gridwidth=1,
+        griddash='dash',
+        zeroline=True,
+        zerolinecolor='lightgrey',
+        zerolinewidth=2,
+        ticksuffix="  "
+    )
+)).to_plotly_json()
+
+# Array containers don't merge from templates, so the selector is applied per figure
+RANGE_SELECTOR = dict(
+    yanchor="top",
+    xanchor="left",
+    x=0.7,
+    buttons=[
+        dict(count=1, label="1m", step="month", stepmode="backward"),
+        dict(count=6, label="6m", step="month", stepmode="backward"),
+        dict(count=1, label="YTD", step="year", stepmode="todate"),
+        dict(count=1, label="1y", step="year", stepmode="backward"),
+        dict(step="all")
+    ]
+)
+
+def hovertemplate(label):
+    return f'<b>Date:</b> %{{x|%b %Y}}<br><b>{label}:</b> %{{y:.1%}}<extra></extra>'
+
+def padded_range(values):
+    return [float(np.nanmin(values)) - Y_PADDING, float(np.nanmax(values)) + Y_PADDING]
+
+def build_figure(data, layout):
+    # Traces and layout are plain dicts built from arrays we control, so skip per-property validation
+    layout['template'] = DASHBOARD_TEMPLATE
+    return go.Figure(data=data, layout=layout, _validate=False)
+
+def empty_figure(title, message="Loading data..."):
+    layout = dict(
+        title=dict(text=title),
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        annotations=[dict(text=message, showarrow=False, font=dict(color=GREY))]
+    )
+    return build_figure([], layout)
+
+def create_money_agg_graph(combined_df, visible=None, frequency='Monthly'):
+    types = combined_df['type'].to_numpy()
+    dates = encode_dates(combined_df['fecha'])
+    values = combined_df['monthly_variation'].to_numpy(dtype=float)
+
+    data = []
+    for name in pd.unique(types):
+        mask = types == name
+        data.append(dict(
+            type='bar',
+            name=name,
+            x=dates[mask],
+            y=encode_values(values[mask]),
+            offsetgroup=name,
+            legendgroup=name,
+            showlegend=True,
+            visible=True if visible is None or name in visible else 'legendonly',
+            marker=dict(color=MONEY_COLORS.get(name), line=dict(width=0)),
+            hovertemplate=hovertemplate(f'{frequency} Var%')
+        ))
+
+    layout = dict(
+        title=dict(
+            text=f"Base Money, M2, and Deposits - {frequency} Var %",
+            yanchor='top',
+            xanchor='left',
+            y=0.98
+        ),
+        margin=dict(t=100),
+        legend=dict(
+            title=dict(text="Concepts", font=dict(size=9, color="gray")),
+            orientation="v",
+            yanchor="top",
+            y=1.3,
+            xanchor="left",
+            x=0
+        ),
+        barmode='group',
+        bargroupgap=0.2,
+        xaxis=dict(rangeselector=RANGE_SELECTOR),
+        yaxis=dict(range=padded_range(values))
+    )
+    return build_figure(data, layout)
+
+def create_inflation_graph(ipc, visible=('Total',), zoom_months=INFLATION_ZOOM_MONTHS, frequency='Monthly'):
+    fechas = pd.to_datetime(ipc['Fecha'])
+    dates = encode_dates(fechas)
+    columns = [column for column, _, _ in INFLATION_SERIES]
+    values = ipc[columns].to_numpy(dtype=float)
+
+    data = [
+        dict(
+            type='scatter',
+            mode='lines',
+            name=name,
+            x=dates,
+            y=encode_values(values[:, i]),
+            line=dict(color=color),
+            showlegend=True,
+            visible=True if name in visible else 'legendonly',
+            hovertemplate=hovertemplate(f'{frequency} Inflation%')
+        )
+        for i, (_, name, color) in enumerate(INFLATION_SERIES)
+    ]
+
+    end_date = fechas.max()
+    start_date = end_date - timedelta(days=zoom_months * 30)
+
+    layout = dict(
+        title=dict(text='Inflation'),
+        xaxis=dict(range=[start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')], rangeselector=RANGE_SELECTOR),
+        yaxis=dict(range=padded_range(values)),
+        legend=dict(
+            x=0,
+            y=1.1,
+            xanchor='left',
+            yanchor='top',
+            title=None,
+            orientation="h"
+        )
+    )
+    return build_figure(data, layout)
+
+def create_series_graph(series_by_id, labels):
+    # Catalog series come in their own units (pesos, %, USD), so levels are shown as they are
+    data = [
+        dict(
+            type='scatter',
+            mode='lines',
+            name=labels[id_variable],
+            x=encode_dates(series.index),
+            y=encode_values(series.to_numpy(dtype=float), decimals=2),
+            line=dict(color=SERIES_COLORS[i % len(SERIES_COLORS)]),
+            hovertemplate=f'<b>Date:</b> %{{x|%d %b %Y}}<br><b>{labels[id_variable]}:</b> %{{y:,.2f}}<extra></extra>'
+        )
+        for i, (id_variable, series) in enumerate(series_by_id.items())
+    ]
+
+    layout = dict(
+        title=dict(text='BCRA Series'),
+        xaxis=dict(rangeselector=RANGE_SELECTOR),
+        yaxis=dict(tickformat=',.2f'),
+        legend=dict(x=0, y=1.1, xanchor='left', yanchor='top', title=None, orientation="h")
+    )
+    return build_figure(data, layout)
@@ -1,29 +1,50 @@
-from dash import html, dcc
-import plotly.express as px
-from datetime import timedelta
-from backend import (
-    get_combined_data, get_inflation_data, get_policy_rate_data, 
-    get_rem_data, get_dollar_data, get_dollar_future, calculate_exp_dev_adj_rate
+from urllib.parse import urlparse
+from dash import html, dcc, callback, no_update, Input, Output, State
+from dash.exceptions import PreventUpdate
+from flask import has_request_context, request
+from backend import build_kpis, get_series
+from catalog import catalog_options, known_ids, series_label
+from figures import (
+    INFLATION_ZOOM_MONTHS, create_money_agg_graph, create_inflation_graph, create_series_graph, empty_figure
+)
+from data_store import store
+from push import FIGURE_SOURCES
+from views import (
+    DEFAULT_VIEW, figure_cache, inflation_params, inflation_view, money_params, money_view, parse_view,
+    trace_names, view_cache
 )
 
-def create_layout():
-    combined_df = get_combined_data()
-    ipc = get_inflation_data()
+VERSION_POLL_MS = 60 * 1000
+MAX_CUSTOM_SERIES = 5
 
-    policy_rate, monthly_policy_rate = get_policy_rate_data()
-    rem_12_month, real_policy_rate = get_rem_data(policy_rate)
-    min_official_dollar = get_dollar_data()
-    dollar_future = get_dollar_future()
+def request_view():
+    if not has_request_context():
+        return DEFAULT_VIEW
+    # The renderer fetches /_dash-layout without the page's query string, which only arrives as the referrer
+    if request.args:
+        return parse_view(request.query_string.decode())
+    return parse_view(urlparse(request.referrer or '').query)
 
-    if min_official_dollar is not None and dollar_future is not None:
-        exp_dev_adj_rate = calculate_exp_dev_adj_rate(min_official_dollar, dollar_future, policy_rate)
-    else:
-        exp_dev_adj_rate = "N/A"  
+def render_view(view, snapshot):
+    figures = (money_figure(snapshot, view), inflation_figure(snapshot, view))
+    return render_layout(snapshot, figures), figures
 
-    money_agg = create_money_agg_graph(combined_df)
-    inflation = create_inflation_graph(ipc)
+def cached_view(view, snapshot):
+    return view_cache.get((view, snapshot.version), lambda: render_view(view, snapshot))
 
-    return html.Div(className='main-container', children=[
+def create_layout():
+    layout, _ = cached_view(request_view(), store.snapshot)
+    return layout
+
+def render_layout(snapshot, figures):
+    kpis = build_kpis(snapshot.data)
+    money_agg, inflation = figures
+
+    # data-version tells assets/stream.js which snapshot the page was rendered from
+    return html.Div(className='main-container', **{'data-version': snapshot.version}, children=[
+        dcc.Location(id='url', refresh=False),
+        dcc.Store(id='data-version', data=snapshot.versions),
+        dcc.Interval(id='version-poll', interval=VERSION_POLL_MS),
         html.Link(
             rel='stylesheet',
             href='https://fonts.googleapis.com/css2?family=Poppins:wght@400;600&display=swap'
@@ -58,184 +79,131 @@ def create_layout():
                 id='inflation-graph',
                 figure=inflation,
                 className='dash-graph'
+            ),
+            dcc.Dropdown(
+                id='series-picker',
+                options=picker_options(snapshot.data),
+                multi=True,
+                placeholder=f"Add BCRA series (up to {MAX_CUSTOM_SERIES})...",
+                className='series-picker'
+            ),
+            dcc.Graph(
+                id='custom-series',
+                figure=empty_figure('BCRA Series', "Pick series above"),
+                className='dash-graph'
             )
         ]),
         html.Div(className='sidebar-right', children=[
             html.Div(className='stat-container', children=[
-                html.P(f'{monthly_policy_rate}', className='stat-value'),
+                html.P(kpis['monthly_policy_rate'], id='monthly-policy-rate', className='stat-value'),
                 html.H4(['Monthly Nominal', html.Br(), 'Policy Rate'], className='stat-title')
             ]),
             html.Div(className='stat-container', children=[
-                html.P(f'{rem_12_month}', className='stat-value'),
+                html.P(kpis['rem_12_month'], id='rem-12-month', className='stat-value'),
                 html.H4(['Expected Inflation', html.Br(), 'Next 12 Months'], className='stat-title')
             ]),
             html.Div(className='stat-container', children=[
-                html.P(f'{real_policy_rate}', className='stat-value'),
+                html.P(kpis['real_policy_rate'], id='real-policy-rate', className='stat-value'),
                 html.H4(['Exp. Inflation Adjusted', html.Br(), 'Policy Rate'], className='stat-title')
             ]),
             html.Div(className='stat-container', children=[
-                html.P(f'{exp_dev_adj_rate}', className='stat-value'),
+                html.P(kpis['exp_dev_adj_rate'], id='exp-dev-adj-rate', className='stat-value'),
                 html.H4(['Devaluation adjusted', html.Br(), 'Policy Rate'], className='stat-title')
             ]),
+            html.P(kpis['dev_adj_curve'], id='dev-adj-curve', className='stat-detail'),
         ]),
     ])
 
-def create_money_agg_graph(combined_df):
-    money_agg = px.bar(
-        combined_df,
-        x='fecha',
-        y='monthly_variation',
-        color='type',
-        title='Base Money, M2, and Deposits - Monthly Var %',
-        labels={'fecha': 'Date', 'monthly_variation': 'Var %'},
-        barmode='group',
-        color_discrete_map={
-            'Base Money': '#5A6ACF',
-            'M2': '#737B8B',
-            'Bank Deposits': '#E6E8EC'
-        }
-    )
-    y_min = combined_df['monthly_variation'].min() - 0.05
-    y_max = combined_df['monthly_variation'].max() + 0.05
-
-    money_agg.update_layout(
-        font=dict(
-            family="Poppins, sans-serif"
-        ),
-        title=dict(
-            text="Base Money, M2, and Deposits - Monthly Var %",
-            yanchor='top',
-            xanchor='left',
-            y=0.98
-        ),
-        margin=dict(t=100),
-        legend=dict(
-            title="Concepts",
-            title_font=dict(size=9, color="gray"),
-            orientation="v",
-            yanchor="top",
-            y=1.3,
-            xanchor="left",
-            x=0
-        ),
-        xaxis_title=None,
-        yaxis_title=None,
-        yaxis_tickformat=',.1%',
-        plot_bgcolor='white',
-        bargroupgap=0.2,
-        xaxis=dict(
-            tickfont=dict(color='#737B8B'),
-            showgrid=False,
-            zeroline=False,
-            rangeslider=dict(
-                visible=True,
-                thickness=0.005,
-                bordercolor="lightgrey",
-                borderwidth=1
-            ),
-            rangeselector=dict(
-                yanchor="top",
-                xanchor="left",
-                x=0.7,
-                buttons=list([
-                    dict(count=1, label="1m", step="month", stepmode="backward"),
-                    dict(count=6, label="6m", step="month", stepmode="backward"),
-                    dict(count=1, label="YTD", step="year", stepmode="todate"),
-                    dict(count=1, label="1y", step="year", stepmode="backward"),
-                    dict(step="all")
-                ])
-            )
-        ),
-        yaxis=dict(
-            range=[y_min, y_max],
-            tickfont=dict(color='#737B8B'),
-            showgrid=True,
-            gridcolor='lightgrey',
-            gridwidth=1,
-            griddash='dash',
-            zeroline=True,
-            zerolinecolor='lightgrey',
-            ticksuffix="  "
-        )
-    )
-
-    money_agg.update_traces(marker=dict(line=dict(width=0)), hovertemplate='<b>Date:</b> %{x|%b %Y}<br><b>Monthly Var%:</b> %{y:.1%}<extra></extra>')
-    return money_agg
-
-def create_inflation_graph(ipc):
-    inflation = px.line(ipc, x='Fecha', y='Nivel general', title='Inflation',
-                        labels={'Fecha': 'Date', 'Nivel general': 'Inflation %'})
-
-    inflation.update_traces(mode='lines', name='Total', line=dict(color='#5A6ACF'))
-
-    inflation.add_traces([
-        dict(x=ipc['Fecha'], y=ipc['Núcleo'], mode='lines', name='Core', line=dict(color='#737B8B')),
-        dict(x=ipc['Fecha'], y=ipc['Estacional'], mode='lines', name='Seasonal', line=dict(color='#CDCFD2')),
-        dict(x=ipc['Fecha'], y=ipc['Regulados'], mode='lines', name='Regulated', line=dict(color='#86AAFF'))
-    ])
-
-    for trace in inflation.data:
-        trace.showlegend = True
-        trace.hovertemplate = '<b>Date:</b> %{x|%b %Y}<br><b>Monthly Inflation%:</b> %{y:.1%}<extra></extra>'
-        trace.visible = 'legendonly' if trace.name != 'Total' else True
-
-    y_min = min(ipc[['Nivel general', 'Núcleo', 'Estacional', 'Regulados']].min()) - 0.05
-    y_max = max(ipc[['Nivel general', 'Núcleo', 'Estacional', 'Regulados']].max()) + 0.05
-
-    end_date = ipc['Fecha'].max()
-    start_date = end_date - timedelta(days=6 * 30)
-
-    inflation.update_layout(
-        font=dict(
-            family="Poppins, sans-serif"
-        ),
-        xaxis_title=None,
-        yaxis_title=None,
-        yaxis_tickformat=',.1%',
-        plot_bgcolor='white',
-        xaxis=dict(
-            range=[start_date, end_date],
-            tickfont=dict(color='#737B8B'),
-            showgrid=False,
-            zeroline=False,
-            rangeslider=dict(
-                visible=True,
-                thickness=0.005,
-                bordercolor="lightgrey",
-                borderwidth=1
-            ),
-            rangeselector=dict(
-                yanchor="top",
-                xanchor="left",
-                x=0.7,
-                buttons=list([
-                    dict(count=1, label="1m", step="month", stepmode="backward"),
-                    dict(count=6, label="6m", step="month", stepmode="backward"),
-                    dict(count=1, label="YTD", step="year", stepmode="todate"),
-                    dict(count=1, label="1y", step="year", stepmode="backward"),
-                    dict(step="all")
-                ])
-            )
-        ),
-        yaxis=dict(
-            range=[y_min, y_max],
-            tickfont=dict(color='#737B8B'),
-            showgrid=True,
-            gridcolor='lightgrey',
-            gridwidth=1,
-            griddash='dash',
-            zeroline=True,
-            zerolinecolor='lightgrey',
-            ticksuffix="  "
-        ),
-        legend=dict(
-            x=-0,  # Adjust this to place the legend at the left margin
-            y=1.1,
-            xanchor='left',
-            yanchor='top',
-            title=None,  # Optionally remove the legend title
-            orientation="h"
-        )
+# The page is served before the first load finishes; the version poll fills it in afterwards
+# Figures are stored as plain dicts so cache hits skip the Figure -> JSON deep copy as well
+def money_figure(snapshot, view):
+    params = money_params(view)
+    months, frequency, series = params
+
+    def render():
+        if 'money' not in snapshot.data:
+            return empty_figure(f"Base Money, M2, and Deposits - {frequency.title()} Var %").to_plotly_json()
+        combined_df = money_view(snapshot.data['money'], months, frequency)
+        return create_money_agg_graph(combined_df, trace_names(series), frequency.title()).to_plotly_json()
+
+    return figure_cache.get(('money', params, snapshot.versions.get('money')), render)
+
+def inflation_figure(snapshot, view):
+    params = inflation_params(view)
+    months, frequency, series = params
+
+    def render():
+        if 'inflation' not in snapshot.data:
+            return empty_figure('Inflation').to_plotly_json()
+        ipc = inflation_view(snapshot.data['inflation'], frequency)
+        zoom_months = months or INFLATION_ZOOM_MONTHS
+        return create_inflation_graph(ipc, trace_names(series), zoom_months, frequency.title()).to_plotly_json()
+
+    return figure_cache.get(('inflation', params, snapshot.versions.get('inflation')), render)
+
+def picker_options(data):
+    catalog = data.get('catalog')
+    return catalog_options(catalog) if catalog is not None else []
+
+# The page keeps the per-source versions it was rendered from, so a poll (or a push from
+# assets/stream.js bumping the interval) only resends the figures whose sources changed
+@callback(
+    Output('base-money', 'figure'),
+    Output('inflation-graph', 'figure'),
+    Output('series-picker', 'options'),
+    Output('monthly-policy-rate', 'children'),
+    Output('rem-12-month', 'children'),
+    Output('real-policy-rate', 'children'),
+    Output('exp-dev-adj-rate', 'children'),
+    Output('dev-adj-curve', 'children'),
+    Output('data-version', 'data'),
+    Input('version-poll', 'n_intervals'),
+    State('data-version', 'data'),
+    State('url', 'search'),
+    prevent_initial_call=True
+)
+def sync_dashboard(n_intervals, rendered, search):
+    snapshot = store.snapshot
+    rendered = rendered if isinstance(rendered, dict) else {}
+    if rendered == snapshot.versions:
+        raise PreventUpdate
+
+    def changed(component):
+        return any(rendered.get(name) != snapshot.versions.get(name) for name in FIGURE_SOURCES[component])
+
+    _, (money_agg, inflation) = cached_view(parse_view(search or ''), snapshot)
+    kpis = build_kpis(snapshot.data)
+    return (
+        money_agg if changed('base-money') else no_update,
+        inflation if changed('inflation-graph') else no_update,
+        picker_options(snapshot.data) if changed('series-picker') else no_update,
+        kpis['monthly_policy_rate'],
+        kpis['rem_12_month'],
+        kpis['real_policy_rate'],
+        kpis['exp_dev_adj_rate'],
+        kpis['dev_adj_curve'],
+        snapshot.versions
     )
 
-    return inflation
+@callback(
+    Output('custom-series', 'figure'),
+    Input('series-picker', 'value'),
+    prevent_initial_call=True
+)
+def update_custom_series(id_variables):
+    catalog = store.snapshot.data.get('catalog')
+    if catalog is None:
+        return empty_figure('BCRA Series', "Loading data...")
+    id_variables = known_ids(catalog, id_variables)
+    if not id_variables:
+        return empty_figure('BCRA Series', "Pick series above")
+    series_by_id = {}
+    for id_variable in id_variables[:MAX_CUSTOM_SERIES]:
+        series = get_series(id_variable)
+        if series.empty:
+            continue
+        series_by_id[id_variable] = series
+    if not series_by_id:
+        return empty_figure('BCRA Series', "No data for the selected series")
+    labels = {id_variable: series_label(catalog, id_variable) for id_variable in series_by_id}
+    return create_series_graph(series_by_id, labels)
@@ -0,0 +1,122 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from refresh_schedule import previous_business_day
+
+LISTED_MONTHS = 13
+MAX_WORKERS = 6
+LOOKBACK_DAYS = 10
+
+def contract_month(day, months_ahead):
+    year, month = divmod(day.year * 12 + day.month - 1 + months_ahead, 12)
+    return year, month + 1
+
+def contract_ticker(year, month):
+    return f"rx_DDF_DLR_{date(year, month, 1).strftime('%b').upper()}{str(year)[2:]}"
+
+def contract_maturity(year, month):
+    # DLR futures settle on the last business day of their month
+    next_year, next_month = contract_month(date(year, month, 1), 1)
+    return previous_business_day(date(next_year, next_month, 1) - timedelta(days=1))
+
+def compact_bars(closes, session_start):
+    # Earlier sessions keep only their last bar, at its own time, so the history stays one row per day
+    earlier = closes[closes.index < session_start]
+    if earlier.index.normalize().is_unique:
+        return closes
+    daily = earlier.groupby(earlier.index.normalize()).tail(1)
+    return pd.concat([daily, closes[closes.index >= session_start]])
+
+def listed_contracts(today, months=LISTED_MONTHS):
+    contracts = {}
+    for months_ahead in range(months):
+        year, month = contract_month(today, months_ahead)
+        contracts[contract_ticker(year, month)] = contract_maturity(year, month)
+    return contracts
+
+class FuturesCurve:
+    """Keeps today's 1-minute bars of every listed DLR future plus the daily close of earlier
+    sessions, and only asks for bars newer than the last one seen. Contracts are fetched
+    concurrently, one request each."""
+
+    def __init__(self, fetch_bars, months=LISTED_MONTHS):
+        # fetch_bars(ticker, start, end) -> DataFrame of bars with 'd' and 'c' columns, start/end as timestamps
+        self.fetch_bars = fetch_bars
+        self.months = months
+        self.bars = {}
+        self.maturities = {}
+        # Past days a contract didn't trade, so thin contracts don't re-walk the lookback every tick
+        self.empty_days = {}
+
+    def _fetch_new_bars(self, ticker, now):
+        last = self.bars.get(ticker)
+        if last is not None and not last.empty:
+            return self.fetch_bars(ticker, last.index[-1] + pd.Timedelta(minutes=1), now)
+        # Nothing cached yet: walk back to the last session with trades, like weekends or holidays
+        today = now.normalize()
+        empty_days = self.empty_days.setdefault(ticker, set())
+        for days_prior in range(LOOKBACK_DAYS):
+            day = today - pd.Timedelta(days=days_prior)
+            if day in empty_days:
+                continue
+            bars = self.fetch_bars(ticker, day, day + pd.Timedelta(days=1))
+            if bars is not None and not bars.empty:
+                return bars
+            # Today may still trade later, earlier days are final
+            if day < today:
+                empty_days.add(day)
+        return None
+
+    def _fetch_contract(self, ticker, now):
+        # One bad response shouldn't cost the rest of the curve
+        try:
+            return self._fetch_new_bars(ticker, now)
+        except Exception as e:
+            print(f"Bars for {ticker} failed: {e}")
+            return None
+
+    def update(self, now=None):
+        now = pd.Timestamp.now(tz='UTC') if now is None else now
+        contracts = listed_contracts(now.date(), self.months)
+        self.maturities = contracts
+        # Expired contracts drop off the curve
+        self.bars = {ticker: bars for ticker, bars in self.bars.items() if ticker in contracts}
+        self.empty_days = {ticker: days for ticker, days in self.empty_days.items() if ticker in contracts}
+
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = dict(zip(contracts, executor.map(lambda ticker: self._fetch_contract(ticker, now), contracts)))
+
+        for ticker, new_bars in results.items():
+            if new_bars is None or new_bars.empty:
+                continue
+            closes = pd.Series(
+                new_bars['c'].to_numpy(dtype=float), index=pd.to_datetime(new_bars['d'], utc=True), name=ticker
+            )
+            existing = self.bars.get(ticker)
+            if existing is not None:
+                closes = pd.concat([existing[existing.index < closes.index[0]], closes])
+            self.bars[ticker] = closes
+        session_start = now.normalize()
+        self.bars = {ticker: compact_bars(bars, session_start) for ticker, bars in self.bars.items()}
+        return self.closes()
+
+    def closes(self):
+        # One column per maturity, carried forward so every bar time has a full curve
+        if not self.bars:
+            return pd.DataFrame()
+        frame = pd.concat(self.bars.values(), axis=1).sort_index().ffill()
+        frame.columns = [pd.Timestamp(self.maturities[ticker]) for ticker in frame.columns]
+        return frame[sorted(frame.columns)]
+
+def implied_devaluation(closes, spot):
+    """Annualized devaluation implied by each future against the spot rate, in percent,
+    for every bar time and maturity at once."""
+    if closes.empty:
+        return closes
+    maturities = closes.columns.values.astype('datetime64[D]')
+    times = closes.index.tz_localize(None).values.astype('datetime64[D]')
+    days = (maturities[np.newaxis, :] - times[:, np.newaxis]).astype(float)
+    days[days <= 0] = np.nan
+    ratio = closes.to_numpy(dtype=float) / spot
+    return pd.DataFrame((ratio ** (365 / days) - 1) * 100, index=closes.index, columns=closes.columns)
@@ -0,0 +1,77 @@
+import json
+import threading
+from collections import deque
+from backend import build_kpis
+
+KEEPALIVE_SECONDS = 15
+HISTORY = 50
+RECONNECT_MS = 5000
+
+# Sources behind each figure; a change in any of them means the figure must be refetched
+FIGURE_SOURCES = {
+    'base-money': ('money',),
+    'inflation-graph': ('inflation',),
+    'series-picker': ('catalog',),
+}
+
+def snapshot_diff(previous, snapshot):
+    old_kpis = build_kpis(previous.data)
+    new_kpis = build_kpis(snapshot.data)
+    changed = [
+        figure for figure, sources in FIGURE_SOURCES.items()
+        if any(previous.versions.get(name) != snapshot.versions.get(name) for name in sources)
+    ]
+    return {
+        'version': snapshot.version,
+        'kpis': {key.replace('_', '-'): value for key, value in new_kpis.items() if old_kpis.get(key) != value},
+        'figures': changed,
+    }
+
+class Broadcaster:
+    """Encodes each snapshot change once and fans it out to every open stream.
+
+    Streams only wait on a shared condition, so in the gevent process of stream_app.py
+    each open connection is a greenlet rather than an OS thread."""
+
+    def __init__(self, store):
+        self.store = store
+        self.events = deque(maxlen=HISTORY)
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.open_streams = 0
+        store.subscribe(self.publish)
+
+    def publish(self, previous, snapshot):
+        payload = json.dumps(snapshot_diff(previous, snapshot))
+        with self.condition:
+            self.sequence += 1
+            message = f"id: {self.sequence}\nevent: snapshot\ndata: {payload}\n\n"
+            self.events.append((self.sequence, message))
+            self.condition.notify_all()
+
+    def pending(self, last_seen):
+        return [message for sequence, message in self.events if sequence > last_seen]
+
+    def stream(self, last_seen=None):
+        with self.condition:
+            last_seen = self.sequence if last_seen is None else last_seen
+            self.open_streams += 1
+        try:
+            # Tell the client which version it should be on before waiting for changes
+            yield f"retry: {RECONNECT_MS}\nevent: hello\ndata: {json.dumps({'version': self.store.version})}\n\n"
+            yield from self._events(last_seen)
+        finally:
+            with self.condition:
+                self.open_streams -= 1
+
+    def _events(self, last_seen):
+        while True:
+            with self.condition:
+                if self.sequence == last_seen:
+                    self.condition.wait(KEEPALIVE_SECONDS)
+                messages = self.pending(last_seen)
+                last_seen = self.sequence
+            if messages:
+                yield ''.join(messages)
+            else:
+                yield ": keepalive\n\n"
@@ -0,0 +1,141 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import requests
+
+RATE_LIMIT_DB = os.environ.get(
+    'RATE_LIMIT_DB', os.path.join(tempfile.gettempdir(), 'argentina_dashboard_rate_limit.sqlite')
+)
+
+# Requests per second and burst size per upstream host, shared by every worker on the machine
+HOST_LIMITS = {
+    'api.bcra.gob.ar': (2.0, 5),
+    'rofex.primary.ventures': (2.0, 4),
+    'www.indec.gob.ar': (1.0, 2),
+}
+DEFAULT_LIMIT = (1.0, 2)
+
+THROTTLED_STATUS = (429, 503)
+BACKOFF_BASE = 2.0
+BACKOFF_CAP = 120.0
+MAX_RETRIES = 4
+STALE_WAITER_SECONDS = 600
+# Connect and read timeouts; every source refreshes on one thread, so a stalled socket must not hang it
+REQUEST_TIMEOUT = (10, 60)
+
+class RateLimiter:
+    def __init__(self, path=RATE_LIMIT_DB, limits=HOST_LIMITS):
+        self.path = path
+        self.limits = limits
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "host TEXT PRIMARY KEY, tokens REAL, updated REAL, blocked_until REAL, failures INTEGER)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS waiters (host TEXT, pid INTEGER, since REAL)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self, conn):
+        # IMMEDIATE takes the write lock up front so processes serialize on the bucket row
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _bucket(self, conn, host, now):
+        rate, burst = self.limits.get(host, DEFAULT_LIMIT)
+        row = conn.execute(
+            "SELECT tokens, updated, blocked_until, failures FROM buckets WHERE host = ?", (host,)
+        ).fetchone()
+        if row is None:
+            tokens, blocked_until, failures = float(burst), 0.0, 0
+        else:
+            tokens, updated, blocked_until, failures = row
+            tokens = min(float(burst), tokens + (now - updated) * rate)
+        return rate, tokens, blocked_until, failures
+
+    def _save(self, conn, host, tokens, now, blocked_until, failures):
+        conn.execute(
+            "INSERT OR REPLACE INTO buckets (host, tokens, updated, blocked_until, failures) VALUES (?, ?, ?, ?, ?)",
+            (host, tokens, now, blocked_until, failures)
+        )
+
+    def acquire(self, host):
+        with self._connect() as conn:
+            waiter = conn.execute(
+                "INSERT INTO waiters (host, pid, since) VALUES (?, ?, ?)", (host, os.getpid(), time.time())
+            ).lastrowid
+            try:
+                while True:
+                    now = time.time()
+                    with self._transaction(conn):
+                        rate, tokens, blocked_until, failures = self._bucket(conn, host, now)
+                        if now < blocked_until:
+                            wait = blocked_until - now
+                        elif tokens >= 1:
+                            self._save(conn, host, tokens - 1, now, blocked_until, failures)
+                            return
+                        else:
+                            wait = (1 - tokens) / rate
+                        self._save(conn, host, tokens, now, blocked_until, failures)
+                    # Jitter so queued workers don't all wake up on the same tick
+                    time.sleep(wait + random.uniform(0, 0.1))
+            finally:
+                conn.execute("DELETE FROM waiters WHERE rowid = ?", (waiter,))
+
+    def report(self, host, status_code, retry_after=None):
+        now = time.time()
+        with self._connect() as conn, self._transaction(conn):
+            rate, tokens, blocked_until, failures = self._bucket(conn, host, now)
+            if status_code in THROTTLED_STATUS:
+                failures += 1
+                backoff = min(BACKOFF_CAP, BACKOFF_BASE ** failures)
+                if retry_after is not None:
+                    backoff = max(backoff, retry_after)
+                blocked_until = max(blocked_until, now + backoff)
+            else:
+                failures = 0
+            self._save(conn, host, tokens, now, blocked_until, failures)
+
+    def queue_depth(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM waiters WHERE since < ?", (time.time() - STALE_WAITER_SECONDS,))
+            rows = conn.execute("SELECT host, COUNT(*) FROM waiters GROUP BY host").fetchall()
+        return dict(rows)
+
+def parse_retry_after(response):
+    value = response.headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+limiter = RateLimiter()
+
+def limited_get(url, **kwargs):
+    host = urlparse(url).hostname
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.acquire(host)
+        response = requests.get(url, **kwargs)
+        limiter.report(host, response.status_code, parse_retry_after(response))
+        if response.status_code not in THROTTLED_STATUS:
+            break
+        print(f"{host} throttled request with status code {response.status_code}, attempt {attempt + 1}")
+    return response
@@ -0,0 +1,235 @@
+import threading
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+AR_TZ = ZoneInfo('America/Argentina/Buenos_Aires')
+
+TICK_SECONDS = 60
+OVERDUE_POLL = timedelta(hours=6)
+
+# National holidays on fixed dates. Some of these get moved by decree each year,
+# add the moved dates to EXTRA_HOLIDAYS when the official calendar is published.
+FIXED_HOLIDAYS = {
+    (1, 1), (3, 24), (4, 2), (5, 1), (5, 25), (6, 17), (6, 20),
+    (7, 9), (8, 17), (10, 12), (11, 20), (12, 8), (12, 25)
+}
+EXTRA_HOLIDAYS = set()
+
+def easter_sunday(year):
+    # Anonymous Gregorian algorithm
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+@lru_cache(maxsize=None)
+def holidays(year):
+    easter = easter_sunday(year)
+    movable = {
+        easter - timedelta(days=48),  # Carnival Monday
+        easter - timedelta(days=47),  # Carnival Tuesday
+        easter - timedelta(days=3),   # Holy Thursday, markets are closed
+        easter - timedelta(days=2),   # Good Friday
+    }
+    fixed = {date(year, month, day) for month, day in FIXED_HOLIDAYS}
+    extra = {day for day in EXTRA_HOLIDAYS if day.year == year}
+    return frozenset(fixed | movable | extra)
+
+def is_business_day(day):
+    return day.weekday() < 5 and day not in holidays(day.year)
+
+def next_business_day(day):
+    while not is_business_day(day):
+        day += timedelta(days=1)
+    return day
+
+def previous_business_day(day):
+    while not is_business_day(day):
+        day -= timedelta(days=1)
+    return day
+
+def business_days_before(day, n):
+    day = previous_business_day(day)
+    for _ in range(n):
+        day = previous_business_day(day - timedelta(days=1))
+    return day
+
+def nth_business_day(year, month, n):
+    day = next_business_day(date(year, month, 1))
+    for _ in range(n - 1):
+        day = next_business_day(day + timedelta(days=1))
+    return day
+
+def at_time(day, hour, minute=0):
+    return datetime(day.year, day.month, day.day, hour, minute, tzinfo=AR_TZ)
+
+def shift_month(year, month, months):
+    year, month = divmod(year * 12 + month - 1 + months, 12)
+    return year, month + 1
+
+class DailySchedule:
+    """Publishes once per business day at a fixed local time, with data up to `lag_days`
+    business days before the release."""
+
+    def __init__(self, hour, minute=0, lag_days=0, fast_poll=timedelta(minutes=30), catchup=timedelta(hours=12)):
+        self.hour = hour
+        self.minute = minute
+        self.lag_days = lag_days
+        self.fast_poll = fast_poll
+        self.catchup = catchup
+
+    def expected_observation(self, release):
+        return business_days_before(release.date(), self.lag_days)
+
+    def release_before(self, now):
+        day = now.date()
+        if is_business_day(day) and now >= at_time(day, self.hour, self.minute):
+            return at_time(day, self.hour, self.minute)
+        return at_time(previous_business_day(day - timedelta(days=1)), self.hour, self.minute)
+
+class MonthlySchedule:
+    """Publishes once a month, either on the nth business day or on a calendar day
+    rolled forward to the next business day."""
+
+    def __init__(self, hour, business_day=None, day=None, lag_months=1, fast_poll=timedelta(hours=1),
+                 catchup=timedelta(days=5)):
+        self.hour = hour
+        self.business_day = business_day
+        self.day = day
+        self.lag_months = lag_months
+        self.fast_poll = fast_poll
+        self.catchup = catchup
+
+    def expected_observation(self, release):
+        # A release covers the month `lag_months` before it, dated anywhere in that month
+        return date(*shift_month(release.year, release.month, -self.lag_months), 1)
+
+    def release_in(self, year, month):
+        if self.business_day is not None:
+            day = nth_business_day(year, month, self.business_day)
+        else:
+            day = next_business_day(date(year, month, self.day))
+        return at_time(day, self.hour)
+
+    def release_before(self, now):
+        release = self.release_in(now.year, now.month)
+        if release <= now:
+            return release
+        return self.release_in(*shift_month(now.year, now.month, -1))
+
+class IntradaySchedule:
+    """Publishes a new bar every `interval` while the market is open."""
+
+    def __init__(self, open_hour, close_hour, interval=timedelta(minutes=15)):
+        self.open_hour = open_hour
+        self.close_hour = close_hour
+        self.fast_poll = interval
+        self.catchup = timedelta(hours=close_hour - open_hour)
+        self.interval = interval
+
+    def expected_observation(self, release):
+        # Thin contracts may not trade in the last minutes, so any bar from the last interval will do
+        return release - self.interval
+
+    def release_before(self, now):
+        day = now.date()
+        if is_business_day(day) and now >= at_time(day, self.open_hour):
+            close = at_time(day, self.close_hour)
+            if now >= close:
+                return close
+            steps = (now - at_time(day, self.open_hour)) // self.interval
+            return at_time(day, self.open_hour) + steps * self.interval
+        return at_time(previous_business_day(day - timedelta(days=1)), self.close_hour)
+
+def delivered(schedule, release, observed):
+    expected = schedule.expected_observation(release)
+    if isinstance(expected, datetime):
+        return observed >= expected
+    return observed.date() >= expected
+
+SCHEDULES = {
+    # The aggregates come out a couple of business days after the date they refer to
+    'money': DailySchedule(hour=18, lag_days=2),
+    'policy_rate': DailySchedule(hour=18),
+    'dollar': DailySchedule(hour=16),
+    'rem': MonthlySchedule(hour=17, business_day=5),
+    'inflation': MonthlySchedule(hour=16, day=13),
+    'dollar_futures': IntradaySchedule(open_hour=10, close_hour=17),
+    # The listing rarely changes; catalog.py keeps its own day-long cache on disk
+    'catalog': DailySchedule(hour=9, lag_days=1),
+}
+
+class SourceState:
+    def __init__(self):
+        self.satisfied = None
+        self.last_attempt = None
+
+class RefreshScheduler:
+    def __init__(self, store, schedules=SCHEDULES):
+        self.store = store
+        self.schedules = schedules
+        self.states = {name: SourceState() for name in schedules}
+        self._thread = None
+
+    def due_sources(self, now):
+        due = []
+        for name, schedule in self.schedules.items():
+            state = self.states[name]
+            release = schedule.release_before(now)
+            if state.satisfied is not None and state.satisfied >= release:
+                continue
+            # Poll fast right after an expected release, slowly if it is running late
+            interval = schedule.fast_poll if now - release <= schedule.catchup else OVERDUE_POLL
+            if state.last_attempt is None or now - state.last_attempt >= interval:
+                due.append(name)
+        return due
+
+    def refresh(self, names, now):
+        # Releases are judged by the date of the data, not by whether it changed: a policy rate
+        # that stays flat for weeks is still a new release every day
+        previous = self.store.snapshot.observed
+        snapshot = self.store.refresh(names)
+        for name in names:
+            state = self.states[name]
+            state.last_attempt = now
+            observed = snapshot.observed.get(name)
+            if observed is None:
+                continue
+            schedule = self.schedules[name]
+            release = schedule.release_before(now)
+            # Newer data than the last poll counts too, in case a source lags more than its schedule says
+            advanced = previous.get(name) is not None and observed > previous[name]
+            if delivered(schedule, release, observed) or advanced:
+                state.satisfied = release
+
+    def run_pending(self):
+        now = datetime.now(AR_TZ)
+        names = self.due_sources(now)
+        if names:
+            self.refresh(names, now)
+        return names
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        def loop():
+            while True:
+                # Anything escaping a tick (a listener, say) must not end the refresh thread for good
+                try:
+                    self.run_pending()
+                except Exception as e:
+                    print(f"Refresh tick failed: {e}")
+                time.sleep(TICK_SECONDS)
+
+        self._thread = threading.Thread(target=loop, name='data-refresh', daemon=True)
+        self._thread.start()
@@ -0,0 +1,35 @@
+import base64
+import os
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+
+# Figures show percentages to 0.1%, so four decimals of the underlying fraction is plenty
+DISPLAY_DECIMALS = int(os.environ.get('FIGURE_DECIMALS', 4))
+# Plotly.js >= 2.28 (bundled with Dash >= 2.15) reads base64 typed arrays directly
+TYPED_ARRAYS = os.environ.get('FIGURE_TYPED_ARRAYS', '1') == '1'
+# float32 has a 24-bit mantissa; below 2**22 units of the last kept decimal its error is under half of one
+FLOAT32_STEPS = 2 ** 22
+
+try:
+    import orjson  # noqa: F401
+    # Dash serializes figures through plotly.io; orjson only pulls ahead on the larger series payloads
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
+def encode_values(values, decimals=DISPLAY_DECIMALS):
+    values = np.round(np.asarray(values, dtype=float), decimals)
+    if not TYPED_ARRAYS:
+        return values
+    # Percentages fit float32 after rounding; levels like millions of pesos need float64 to keep their decimals
+    largest = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 0
+    dtype = 'f4' if largest * 10 ** decimals < FLOAT32_STEPS else 'f8'
+    return {'dtype': dtype, 'bdata': base64.b64encode(values.astype('<' + dtype).tobytes()).decode('ascii')}
+
+def encode_dates(values):
+    dates = pd.to_datetime(values).to_numpy(dtype='datetime64[D]')
+    # Monthly series dated on the 1st serialize as 'YYYY-MM', which Plotly reads as the same date
+    if len(dates) and (dates.astype('datetime64[M]') == dates).all():
+        return np.datetime_as_string(dates, unit='M')
+    return np.datetime_as_string(dates, unit='D')
@@ -0,0 +1,128 @@
+import pandas as pd
+
+# Resample rules and the period that each output label covers
+PERIODS = {'W': 'W', 'ME': 'M', 'QE': 'Q', 'YE': 'Y'}
+
+# Each operation gets the full input series and the first date that changed,
+# and returns only the recomputed tail of its output.
+
+def op_sum(inputs, since):
+    joined = pd.concat([series[series.index >= since] for series in inputs], axis=1, join='inner')
+    return joined.sum(axis=1)
+
+def op_ratio(inputs, since):
+    numerator, denominator = (series[series.index >= since] for series in inputs)
+    joined = pd.concat([numerator, denominator], axis=1, join='inner')
+    return joined.iloc[:, 0] / joined.iloc[:, 1]
+
+def op_deflate(inputs, since):
+    # Nominal values divided by a price index, both on the same dates
+    return op_ratio(inputs, since)
+
+def op_resample(inputs, since, rule='ME', how='mean'):
+    series = inputs[0]
+    # The period holding `since` has to be rebuilt from its first observation
+    period_start = pd.Timestamp(since).to_period(PERIODS[rule]).start_time
+    return series[series.index >= period_start].resample(rule).agg(how)
+
+def op_pct_change(inputs, since, periods=1):
+    series = inputs[0]
+    position = series.index.searchsorted(since)
+    window = series.iloc[max(position - periods, 0):]
+    return window.pct_change(periods=periods).iloc[min(position, periods):]
+
+OPERATIONS = {
+    'sum': op_sum,
+    'ratio': op_ratio,
+    'deflate': op_deflate,
+    'resample': op_resample,
+    'pct_change': op_pct_change,
+}
+
+def empty_series():
+    return pd.Series(dtype=float, index=pd.DatetimeIndex([]))
+
+class Node:
+    def __init__(self, name, operation=None, inputs=(), params=None):
+        self.name = name
+        self.operation = operation
+        self.inputs = list(inputs)
+        self.params = params or {}
+
+class SeriesGraph:
+    """Raw series are source nodes; derived nodes declare an operation and their inputs.
+    Updates mark the first changed date, and recompute only touches dirty nodes from there on."""
+
+    def __init__(self):
+        self.nodes = {}
+        self.order = []
+        self.values = {}
+        self.dirty = {}
+
+    def source(self, name):
+        self.nodes[name] = Node(name)
+        self.order.append(name)
+        self.values[name] = empty_series()
+        return self
+
+    def derive(self, name, operation, inputs, **params):
+        missing = [input_name for input_name in inputs if input_name not in self.nodes]
+        if missing:
+            raise ValueError(f"Unknown inputs for '{name}': {missing}")
+        self.nodes[name] = Node(name, OPERATIONS[operation], inputs, params)
+        # Inputs must already exist, so insertion order is a valid topological order
+        self.order.append(name)
+        self.values[name] = empty_series()
+        return self
+
+    def last_date(self, name):
+        series = self.values[name]
+        return series.index[-1] if not series.empty else None
+
+    def update(self, name, rows):
+        rows = rows.sort_index()
+        if rows.empty:
+            return
+        existing = self.values[name]
+        overlap = existing[existing.index >= rows.index[0]]
+        changed = rows[~rows.index.isin(overlap.index) | (rows != overlap.reindex(rows.index))]
+        if changed.empty:
+            return
+        self.values[name] = pd.concat([existing[existing.index < rows.index[0]], rows])
+        self._mark(name, changed.index[0])
+
+    def trim(self, start):
+        # Drops everything before `start` and rebuilds from there, so a long-running graph
+        # ends up exactly like one first loaded from `start`
+        start = pd.Timestamp(start)
+        for name in self.order:
+            series = self.values[name]
+            if series.empty or series.index[0] >= start:
+                continue
+            self.values[name] = series[series.index >= start]
+            if self.nodes[name].operation is None:
+                self._mark(name, start)
+
+    def _mark(self, name, since):
+        current = self.dirty.get(name)
+        self.dirty[name] = since if current is None else min(current, since)
+
+    def recompute(self):
+        for name in self.order:
+            node = self.nodes[name]
+            if node.operation is None:
+                continue
+            changes = [self.dirty[input_name] for input_name in node.inputs if input_name in self.dirty]
+            if not changes:
+                continue
+            since = min(changes)
+            inputs = [self.values[input_name] for input_name in node.inputs]
+            tail = node.operation(inputs, since, **node.params)
+            start = tail.index[0] if not tail.empty else since
+            existing = self.values[name]
+            self.values[name] = pd.concat([existing[existing.index < start], tail])
+            self._mark(name, start)
+        self.dirty = {}
+
+    def __getitem__(self, name):
+        return self.values[name]
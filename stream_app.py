@@ -0,0 +1,30 @@
+from flask import Flask, Response, jsonify, request
+from data_store import store
+from push import Broadcaster
+from refresh_schedule import RefreshScheduler
+
+# Serves /api/stream on its own so open streams never take the dashboard's request threads.
+# Run under gevent (see Procfile) with nginx routing /api/stream here (.platform/nginx):
+# every open stream is then a greenlet waiting on the Broadcaster.
+application = Flask(__name__)
+
+# Subscribe before the first load so no snapshot change is missed. Versions are content hashes,
+# so this store's events match the versions the dashboard workers render from.
+broadcaster = Broadcaster(store)
+
+scheduler = RefreshScheduler(store)
+scheduler.start()
+
+@application.route('/api/stream')
+def stream():
+    last_event_id = request.headers.get('Last-Event-ID')
+    last_seen = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    return Response(
+        broadcaster.stream(last_seen),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@application.route('/api/streams')
+def streams():
+    return jsonify(open=broadcaster.open_streams, version=store.version)
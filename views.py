@@ -0,0 +1,150 @@
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import timedelta
+from urllib.parse import parse_qs
+import pandas as pd
+from backend import MONEY_HISTORY_MONTHS
+from figures import INFLATION_SERIES
+
+VIEW_CACHE_SIZE = int(os.environ.get('VIEW_CACHE_SIZE', 64))
+# History windows in months; anything else falls back to the default view
+WINDOWS = (3, 6, 12, 24, 60)
+# Only the inflation sheet goes back further than MONEY_HISTORY_MONTHS, money windows are capped to it
+FREQUENCIES = ('monthly', 'quarterly')
+# URL name -> trace name, for ?series=base,m2,core
+SERIES = {
+    'base': 'Base Money',
+    'deposits': 'Bank Deposits',
+    'm2': 'M2',
+    'total': 'Total',
+    'core': 'Core',
+    'seasonal': 'Seasonal',
+    'regulated': 'Regulated',
+}
+DEFAULT_SERIES = ('base', 'deposits', 'm2', 'total')
+MONEY_SERIES_NAMES = ('base', 'deposits', 'm2')
+# monthly_variation() dates each month 28 days before its last day
+MONEY_DATE_SHIFT = timedelta(days=28)
+
+# window is None for the original view: the whole money history and six months of inflation
+View = namedtuple('View', ['window', 'frequency', 'series'])
+DEFAULT_VIEW = View(None, 'monthly', DEFAULT_SERIES)
+
+def parse_window(text):
+    if text.endswith('y') and text[:-1].isdigit():
+        months = int(text[:-1]) * 12
+    elif text.rstrip('m').isdigit():
+        months = int(text.rstrip('m'))
+    else:
+        return None
+    return months if months in WINDOWS else None
+
+def parse_view(query):
+    """Normalizes a page query string like ?window=2y&freq=quarterly&series=total,core, so
+    equivalent URLs share one cache entry and unknown values can't grow the key space."""
+    args = parse_qs(query.lstrip('?'))
+
+    def first(name):
+        values = args.get(name)
+        return values[0].strip().lower() if values else ''
+
+    frequency = first('freq')
+    requested = first('series').split(',')
+    return View(
+        parse_window(first('window')),
+        frequency if frequency in FREQUENCIES else DEFAULT_VIEW.frequency,
+        tuple(name for name in SERIES if name in requested) or DEFAULT_VIEW.series
+    )
+
+def trace_names(series):
+    return {SERIES[name] for name in series}
+
+# Each figure is cached on just the parts of the view it depends on, so views that differ
+# only in the other figure share it. Without any of its own series a figure shows its defaults.
+def money_params(view):
+    months = min(view.window, MONEY_HISTORY_MONTHS) if view.window else None
+    series = tuple(name for name in view.series if name in MONEY_SERIES_NAMES) or MONEY_SERIES_NAMES
+    return months, view.frequency, series
+
+def inflation_params(view):
+    series = tuple(name for name in view.series if name not in MONEY_SERIES_NAMES) or ('total',)
+    return view.window, view.frequency, series
+
+def quarterly_money(combined_df):
+    # Quarter on quarter change of the average level, rebuilt from the monthly averages
+    frames = []
+    for name, group in combined_df.groupby('type', sort=False):
+        months = pd.Series(group['valor'].to_numpy(dtype=float), index=group['fecha'] + MONEY_DATE_SHIFT)
+        quarters = months.resample('QE').agg(['mean', 'count'])
+        # Partial quarters skew the average, as a cut-off base or as a quarter still in progress
+        quarters = quarters[quarters['count'] == 3]
+        variation = quarters['mean'].pct_change().dropna()
+        frames.append(pd.DataFrame({
+            'fecha': variation.index.to_period('Q').start_time,
+            'valor': quarters['mean'].loc[variation.index].to_numpy(),
+            'monthly_variation': variation.to_numpy(),
+            'type': name
+        }))
+    if not frames:
+        return combined_df.iloc[0:0]
+    return pd.concat(frames, ignore_index=True)
+
+def quarterly_inflation(ipc):
+    # Monthly rates compound into the quarter; only complete quarters are shown
+    columns = [column for column, _, _ in INFLATION_SERIES]
+    rates = ipc[columns].astype(float).set_index(pd.to_datetime(ipc['Fecha']))
+    growth = (1 + rates).resample('QE')
+    quarterly = growth.prod() - 1
+    quarterly = quarterly[growth.count().min(axis=1) == 3]
+    quarterly.index = quarterly.index.to_period('Q').start_time
+    return quarterly.rename_axis('Fecha').reset_index()
+
+def money_view(combined_df, months, frequency):
+    if frequency == 'quarterly':
+        combined_df = quarterly_money(combined_df)
+    if months and not combined_df.empty:
+        cutoff = combined_df['fecha'].max() - pd.DateOffset(months=months)
+        combined_df = combined_df[combined_df['fecha'] > cutoff]
+    return combined_df
+
+def inflation_view(ipc, frequency):
+    if frequency == 'quarterly':
+        return quarterly_inflation(ipc)
+    return ipc
+
+class ViewCache:
+    """Bounded LRU of rendered views or figures, keyed by their parameters and the versions of
+    the data they were built from. Entries for older versions are never hit again and age out
+    on their own. Renders run outside the lock, so a miss on one view doesn't hold up hits on
+    the others."""
+
+    def __init__(self, maxsize=VIEW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+        rendered = render()
+        with self.lock:
+            self.entries[key] = rendered
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return rendered
+
+    def stats(self):
+        with self.lock:
+            return {'size': len(self.entries), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
+
+# Whole layouts per (view, snapshot version), and figures per (figure, params, source version):
+# an intraday futures tick re-renders the layout around the figures already built
+view_cache = ViewCache()
+figure_cache = ViewCache()